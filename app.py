@@ -1,146 +1,215 @@
-import matplotlib
-matplotlib.use('Agg')
-from dash import Dash, dcc, html
-import pandas as pd
-import plotly.express as px
-from dash.dependencies import Input, Output
-from wordcloud import WordCloud, STOPWORDS
-import io
+from dash import Dash, DiskcacheManager, dcc, html, no_update
+from dash.dependencies import Input, Output, State, MATCH, ClientsideFunction
+from flask import has_request_context
+from flask_compress import Compress
+import diskcache
 import base64
-import matplotlib.pyplot as plt
-from datetime import date
-import os
 import datetime
-import json
+import hashlib
+import os
+import glob
 
 # Importing custom layout configurations from layouts.py
-from assets.helper_functions import YesNo_pie_chart, Section_1_pie_chart, create_yes_histogram, Interest_S3_pie_chart, Interest_S4_pie_chart, Agreement_pie_chart, create_pies
+from assets.helper_functions import (create_yes_histogram, create_trend_chart, create_cooccurrence_heatmap,
+                                     create_likert_summary)
+from assets.likert_scores import score_questions
+from assets.question_registry import load_registry, check_columns, columns_of, compile_dispatch
+from assets.aggregates import build_aggregate_store, append_to_store, filter_mask, filtered_counts, yes_summary
+from assets.wordcloud_cache import WordCloudCache, make_wordcloud_key, register_wordcloud_route
+from assets.wordcloud_render import render_wordcloud_png
+from assets.text_analytics import wordcloud_stopwords, build_term_index, append_term_index, term_frequencies, top_terms, top_bigrams
+from assets.reloader import DatasetReloader
+from assets.dataset_cache import DatasetCache
+from assets.ingest import pending_batches, read_batch, batch_key, register_ingest_route
+from assets.survey_loader import load_survey, read_header, iter_survey_chunks
+from assets.trends import TrendEngine, trend_frame, snapshot_date
+from assets.figure_cache import FigureCache, detach_figures, figure_digests, register_figure_route
+from assets.client_charts import new_counts_payload, extract_counts, copy_counts
+from assets.metrics import metrics, register_metrics_route
+from assets import startup_profile
 from assets.layouts import DIV_STYLE, SECTION_LAYOUT, sections, section_subtitles, COUNTER_STYLE, DIV5_STYLE
 
-########################################################################
-TBR_CUSTOM_MODIF_DATE = "13-08-2025"####################################
-########################################################################
-
+startup_profile.mark("imports")
 
-# Load the CSV file
+# The CSV file is watched and reloaded in the background when it changes
 file_path = "stakeholder_consultation.csv"  # Update with your CSV file path
-df = pd.read_csv(file_path, sep=";", encoding="utf-8")
+RELOAD_INTERVAL = int(os.environ.get("CSV_RELOAD_INTERVAL", "30"))  # Seconds between mtime checks
+# With DEFERRED_LOAD=1 the server starts before the data is loaded, requests wait for it (not with gunicorn preload)
+DEFERRED_LOAD = os.environ.get("DEFERRED_LOAD", "0") == "1" and os.environ.get("DASHBOARD_PRELOAD") != "1"
+STARTUP_PROFILE = os.environ.get("STARTUP_PROFILE", "0") == "1"  # Prints how long each startup phase took
+# Streams exports in chunks of this many rows so multi-GB files never sit in memory whole; 0 reads them at once
+CSV_CHUNK_ROWS = int(os.environ.get("CSV_CHUNK_ROWS", "0"))
+# New answers dropped here as CSV files (with the export's header line) are appended without a reload
+INGEST_DIR = os.environ.get("INGEST_DIR", "incoming")
+INGEST_TOKEN = os.environ.get("INGEST_TOKEN", "")  # Enables POST /ingest, which writes into INGEST_DIR
+history_pattern = "OLD_CSV/*.csv"  # Earlier exports, shown next to the live file in the trends tab
+LIVE_DATASET = "live"  # Selector value of the live file; earlier exports go by their file name
+# Ceiling of the earlier exports held in memory at once, the live dataset comes on top
+DATASET_CACHE_MB = int(os.environ.get("DATASET_CACHE_MB", "256"))
+TRENDS_TAB = "Trends over time"
+COUNTS_VERSION = "chart-counts"  # Entry of the rendered sections store: data version of the counts store
+# Crossfilter dropdowns and the column each one restricts every section by
+filter_cols = {"filter-group": 3, "filter-sector": 4}
 
 # Define custom words to omit from the word cloud
-custom_stopwords = set(STOPWORDS).union({"survey", "result", "value", "Blue", "Cloud", "EOSC", "user", "Development", "Activities", "EDITO", "Decade", "making", "working", "BC"})  # Add/remove words as needed , "s"
+custom_stopwords = wordcloud_stopwords().union({"survey", "result", "value", "Blue", "Cloud", "EOSC", "user", "Development", "Activities", "EDITO", "Decade", "making", "working", "BC"})  # Add/remove words as needed , "s"
+
+# Rendered word clouds are kept in memory and on disk, keyed by their content
+WORDCLOUD_PARAMS = {
+    "width": 800,
+    "height": 400,
+    "max_words": 70,
+    "max_font_size": 100,
+    "min_font_size": 10,
+    "background_color": "white",
+}
+WORDCLOUD_CACHE_DIR = os.environ.get("WORDCLOUD_CACHE_DIR", "cache/wordclouds")  # Set to "" for memory only
+wordcloud_cache = WordCloudCache(max_entries=64, cache_dir=WORDCLOUD_CACHE_DIR or None)
+# Uncached word clouds are rendered by background jobs, one process each, and swapped in when done;
+# set WORDCLOUD_JOBS=0 to render them inside the section callback instead
+WORDCLOUD_JOBS = os.environ.get("WORDCLOUD_JOBS", "1") == "1"
+WORDCLOUD_JOBS_DIR = os.environ.get("WORDCLOUD_JOBS_DIR", "cache/jobs")  # Job results, shared by all workers
+
+
+# Initialize the Dash app
+background_manager = DiskcacheManager(diskcache.Cache(WORDCLOUD_JOBS_DIR)) if WORDCLOUD_JOBS else None
+# Job processes exit before any scrape, so they hand what they measured to the workers' /metrics
+job_metrics = (diskcache.Deque(directory=os.path.join(WORDCLOUD_JOBS_DIR, "metrics"))
+               if WORDCLOUD_JOBS and metrics.enabled else None)
+app = Dash(__name__, background_callback_manager=background_manager)
+server = app.server
+app.title = "Survey Results Dashboard"
 
-respondent_count = df.shape[0]  # Number of rows in the DataFrame
+# Figures of the warm charts are serialized once and served from /figures/, by any worker
+FIGURE_CACHE_DIR = os.environ.get("FIGURE_CACHE_DIR", "cache/figures")  # Set to "" for memory only
+figure_cache = FigureCache(max_entries=512, cache_dir=FIGURE_CACHE_DIR or None)
+# With CLIENTSIDE_CHARTS=1 the browser builds unfiltered charts from a counts store instead
+CLIENTSIDE_CHARTS = os.environ.get("CLIENTSIDE_CHARTS", "0") == "1"
+register_figure_route(server, figure_cache)
+def collect_job_metrics():
+    # Each job's samples go to the first worker scraped after it, once
+    while True:
+        try:
+            metrics.add(job_metrics.popleft())
+        except IndexError:
+            return
 
-mod_time = os.path.getmtime(file_path)
-mod_date = datetime.datetime.fromtimestamp(mod_time)
-Latest_modif = mod_date.strftime("%d-%m-%Y")  # Format the date as Month Day, Year
+# Latency histograms and cache counters on /metrics, when DASHBOARD_METRICS=1
+register_metrics_route(server, metrics, collect=collect_job_metrics if job_metrics is not None else None)
+# Word clouds on disk are served from /wordclouds/ by URL; without a disk cache they stay inline
+register_wordcloud_route(server, wordcloud_cache)
+# Callback responses, figures, pages and scripts go out brotli- or gzip-compressed (PNGs are compressed already)
+server.config["COMPRESS_ALGORITHM"] = ["br", "gzip"]
+Compress(server)
+startup_profile.mark("dash app")
 
-# Create JSON structure
-mod_info = {
-    "csv_last_modified": Latest_modif
+# Chart type, answer order, colours and title of every column, keyed by its CSV header
+QUESTION_REGISTRY = "question_registry.json"
+question_registry = load_registry(QUESTION_REGISTRY)
+check_columns(question_registry, [col for section_columns in sections.values() for col in section_columns]
+              + list(filter_cols.values()))
+wordcloud_cols = columns_of(question_registry, "wordcloud")
+extra_hist_cols = columns_of(question_registry, "service")
+
+# Category order of every charted column, used to build the aggregate store
+category_orders = {col: entry["order"] + ([entry["fill"]] if entry["fill"] else [])
+                   for col, entry in question_registry.items() if entry["chart"] == "pie"}
+# create_pies charts missing answers as their own slice
+fill_values = {col: entry["fill"] for col, entry in question_registry.items() if entry["fill"]}
+
+# Only the charted columns are loaded; Likert and Yes/No answers become categories
+used_cols = sorted({col for section_columns in sections.values() for col in section_columns} | set(extra_hist_cols))
+categorical_cols = {
+    **{col: None for col in columns_of(question_registry, "respondent_pie")},
+    **{col: entry["order"] for col, entry in question_registry.items() if entry["chart"] in ("pie", "service")},
 }
 
-# Save to JSON file
-json_path = "modification_info.json"
-with open(json_path, "w") as f:
-    json.dump(mod_info, f, indent=4)
+# Likert questions followed across the exports, each export is only processed once
+likert_cols = sorted(col for col, entry in question_registry.items() if entry["trend"])
+trend_engine = TrendEngine(used_cols, categorical_cols, likert_cols, chunk_rows=CSV_CHUNK_ROWS)
+# Sections whose Likert statements are ranked against each other. Means of different scales
+# (interest, agreement, quality) do not compare, so each section lists its statements grouped by
+# answer order, for one ranking per scale shared by at least two statements
+section_scales = {}
+for section, section_columns in sections.items():
+    scale_groups = {}
+    for col in section_columns:
+        if col in likert_cols:
+            entry = question_registry[col]
+            scale_groups.setdefault(tuple(entry["order"]), {})[entry["question"]] = entry["order"]
+    scale_groups = [scales for scales in scale_groups.values() if len(scales) > 1]
+    if scale_groups:
+        section_scales[section] = scale_groups
 
-with open("modification_info.json") as f:
-    mod_info = json.load(f) # Debugging: check the last modified date
+def summary_questions(section):
+    return [question for scales in section_scales[section] for question in scales]
 
-last_update_date = mod_info["csv_last_modified"]
+def create_graph_for_question(dataset, question, mask=None):
+    # Chart, colours and title of every question were looked up once, when the data was loaded
+    spec = dataset["questions"][question]
+    store = dataset["aggregates"]
+    if spec["chart"] == "wordcloud":  # Only create word clouds for text data
+        return generate_wordcloud_for_question(dataset, question, mask)
+    if spec["chart"] == "service":
+        # Both charts come from one pass over the encoded Yes/No matrix
+        yes_counts, cooccurrence = yes_summary(store, mask)
+        return html.Div([create_yes_histogram(yes_counts), create_cooccurrence_heatmap(cooccurrence)])
 
+    counts = store["counts"][question] if mask is None else filtered_counts(store, question, mask)
+    return spec["build"](counts, question)
 
-# Initialize the Dash app
-app = Dash(__name__)
-server = app.server
-app.title = "Survey Results Dashboard"
+def create_section_summary(dataset, section, mask=None):
+    # Scored from the answer codes, so it costs the same filtered or not; one ranking per scale
+    return html.Div([create_likert_summary(score_questions(dataset["aggregates"], scales, mask),
+                                           next(iter(scales.values())))
+                     for scales in section_scales[section]])
+
+def wordcloud_png_for_question(frequencies, render=True):
+    """Cache key and PNG of the word cloud of summed term counts, no PNG when there are no terms.
+
+    With `render` false only a cached image is returned, None otherwise.
+    """
+    if not frequencies:
+        return None, None
+
+    # Only render again when the counts or parameters changed
+    key = make_wordcloud_key(frequencies, WORDCLOUD_PARAMS)
+    png = wordcloud_cache.get(key)
+    if png is None and render:
+        png = render_wordcloud_png(frequencies, WORDCLOUD_PARAMS)
+        wordcloud_cache.put(key, png)
+    return key, png
+
+def top_terms_table(terms, bigrams):
+    # Most used words and word pairs side by side, below the word cloud
+    cell_style = {'padding': '2px 8px', 'textAlign': 'left'}
+    rows = []
+    for i in range(max(len(terms), len(bigrams))):
+        cells = []
+        for pairs in (terms, bigrams):
+            label, count = pairs[i] if i < len(pairs) else ("", "")
+            cells += [html.Td(label, style=cell_style), html.Td(count, style={**cell_style, 'textAlign': 'right'})]
+        rows.append(html.Tr(cells))
 
-# Graph style definition
-wordcloud_cols = list(range(13, 16)) + list(range(67, 71)) + list(range(84, 87)) + [72,80]
-interestS3_cols = list(range(60, 67))
-interestS4_cols =  list(range(73, 80))
-extra_hist_cols = [16, 18, 20, 22, 24, 26, 28, 30, 32, 34, 36, 38, 40, 42, 44, 46, 48, 50, 52, 54, 56, 58]
-agreement_cols = list(range(81, 84))  # CA to CC
-pies_cols = list([5, 7, 9, 11, 12, 13, 59, 71])  # Z to AG
-YesNo_col = list([6])
-
-def create_graph_for_question(question):
-    #General
-    question_index = df.columns.get_loc(question)
-        
-    # For section1 pie charts
-    if question_index in sections["Section 1: About the Respondent"]:
-        return Section_1_pie_chart(df, question)
-    if question_index in wordcloud_cols:  # Only create word clouds for text data
-        return generate_wordcloud_for_question(question)
-    if question_index in interestS3_cols:
-        return Interest_S3_pie_chart(df, question)
-    if question_index in interestS4_cols:
-        return Interest_S4_pie_chart(df, question)
-    if question_index in agreement_cols:
-        return Agreement_pie_chart(df, question, category_order={"I fully disagree",
-                                                                    "I slightly disagree", 
-                                                                    "I slightly agree", 
-                                                                    "I fully agree"})             
-    if question_index in pies_cols:
-        return create_pies(df, question,category_order=["Very Poor",
-                                                            "Poor", 
-                                                            "Good", 
-                                                            "Very Good",
-                                                            "No Answer"], 
-                                        color_mapping = {"Very Poor": "#e34a42",       
-                                                            "Poor": "#fcd177",     
-                                                            "Good": "#98c792",      
-                                                            "Very Good": "#32a35e",
-                                                            "No Answer": "#d3d3d3"})
-    if question in [df.columns[8]]:
-        return create_pies(df, question, category_order=["Not Useful",
-                                                         "Limited Usefulness",
-                                                         "Useful",
-                                                         "Very Useful"],     
-                                        color_mapping = {"Not Useful": "#e34a42",       
-                                                            "Limited Usefulness": "#fcd177",
-                                                            "Useful": "#98c792",  # Light Olive Green
-                                                            "Very Useful": "#32a35e"})
-    if question in [df.columns[10]]:
-        return create_pies(df, question, category_order=["Very Poor",
-                                                            "Poor", 
-                                                            "Comprehensive",
-                                                           "Very Comprehensive"], 
-                                        color_mapping = {"Very Poor": "#e34a42",       
-                                                            "Poor": "#fcd177",
-                                                            "Comprehensive": "#98c792",      
-                                                            "Very Comprehensive": "#32a35e"})
-    if question_index in YesNo_col:
-        return YesNo_pie_chart(df, question)  
-    if question_index in [df.columns[16]]:
-        return create_yes_histogram(df, extra_hist_cols)
-                                    
-def generate_wordcloud_for_question(question):      
-        text = " ".join(df[question].dropna().astype(str))  # Combine text from the column
-        if len(text.strip()) == 0:
+    header = html.Tr([html.Th("Top terms", colSpan=2, style=cell_style),
+                      html.Th("Top bigrams", colSpan=2, style=cell_style)])
+    return html.Table([html.Thead(header), html.Tbody(rows)],
+                      style={'margin': '10px auto', 'fontSize': '14px', 'color': '#1f2a44'})
+
+def generate_wordcloud_for_question(dataset, question, mask=None, placeholder=None):
+        # Answers were tokenized at load time, the selected respondents only need summing
+        index = dataset["terms"][question]
+        frequencies = term_frequencies(index, mask)
+        key, png = wordcloud_png_for_question(frequencies, render=placeholder is None)
+        if png is None and frequencies:
+            return placeholder  # Not rendered yet, a background job draws it
+        if png is None:
             return html.Div("No valid responses for word cloud.", style={"color": "red"})
-        # Generate the word cloud
-        wordcloud = WordCloud(
-            width=800,
-            height=400,
-            max_words=70,
-            max_font_size=100,
-            min_font_size=10,
-            stopwords=custom_stopwords,
-            background_color="white",
-        ).generate(text)
-
-        # Convert to base64 image for display
-        buffer = io.BytesIO()
-        plt.figure(figsize=(10, 6))  # Reduce figure size
-        plt.imshow(wordcloud, interpolation="bilinear")
-        plt.axis("off")
-        plt.savefig(buffer, format="png", bbox_inches='tight')  # Removes extra padding
-        buffer.seek(0)
-        encoded_image = base64.b64encode(buffer.read()).decode("utf-8")
-        buffer.close()
+        if wordcloud_cache.cache_dir:
+            # On disk, every worker can serve it, and browsers keep it under its content-keyed URL
+            src = wordcloud_cache.url(key)
+        else:
+            src = f"data:image/png;base64,{base64.b64encode(png).decode('utf-8')}"
 
         # Title for word cloud
         title_html = html.Div(
@@ -156,7 +225,7 @@ def generate_wordcloud_for_question(question):
         )
 
         wordcloud_html = html.Img(
-            src=f"data:image/png;base64,{encoded_image}",
+            src=src,
             style={
                 'display': 'block',
                 'margin': 'auto',  # Center the image and remove extra space
@@ -166,7 +235,7 @@ def generate_wordcloud_for_question(question):
         )
 
         return html.Div(
-            [title_html, wordcloud_html],
+            [title_html, wordcloud_html, top_terms_table(top_terms(frequencies), top_bigrams(index, mask))],
             style={
                 'textAlign': 'center',
                 'padding': '10px',
@@ -174,119 +243,493 @@ def generate_wordcloud_for_question(question):
                 'maxWidth': '1000px'  # Limit max width to prevent excessive stretching
             }
         )
-    
 
-app.layout = html.Div(
-    style={"fontFamily": "Arial, sans-serif", "margin": "24px"},
-    children=[
-        # Container for the image and title
-        html.Div(
-            style={
-                "display": "flex",  # Flexbox for side-by-side layout
-                "alignItems": "center",  # Vertically align items
-                "marginBottom": "20px"  # Adds space below this section
-            },
-            children=[
-                # Responsive image
-                html.Img(
-                    src='assets/EOSC _ BlueCloud2026_Payoff_ColourPos.png',  # Replace with your image file path
-                    style={
-                        "width": "35%",  # Larger width for better visibility
-                        "height": "auto",  # Maintain aspect ratio
-                        "maxWidth": "600px",  # Ensure image doesn't get too large
-                        "marginRight": "20px"  # Add space between image and title
-                    }
-                ),
-        # Title of the app
-                html.Div(
-                    children=[
-                        html.H1(
-                            "Stakeholder Consultation Survey Dashboard",
-                            style={
-                                "textAlign": "left",  # Align text to the left
-                                "color": "#2c3e50",
-                                "fontSize": "28px"  # Slightly larger font size for prominence
-                            }
-                        ),
-                        html.P(
-                            "Explore the survey results through interactive visualizations.",
-                            style={
-                                "textAlign": "left",
-                                "color": "#7f8c8d",
-                                "fontSize": "16px"
-                            }
-                        ),
-                    ]
-                )
-            ]
-        ),
-        # Create tabs for each section
-        dcc.Tabs(
-            id="tabs",
-            value="Section 1: About the Respondent",
-            children=[
-                dcc.Tab(
-                    label=section,
-                    value=section,
-                    children=[
-                        # Use the subtitle dictionary to fetch a custom subtitle for each section
-                        html.H2(
-                            section_subtitles.get(section, "Explore this section for detailed insights."),  # Default subtitle if not found
-                            style={"textAlign": "center", "fontSize": "20px", "color": "#34495e"}
-                        ),
-                        html.Div([
-                                f"Respondent Count: {respondent_count}", 
-                                html.Br(), 
-                                f"Latest update: {TBR_CUSTOM_MODIF_DATE}"
-                                ],
-                            style=COUNTER_STYLE
-                        ) if section == "Section 1: About the Respondent" else None,
+def wordcloud_job(dataset, col, filters):
+    """Placeholder of an uncached word cloud; its request store starts the background job rendering it."""
+    question = dataset["header"][col]
+    placeholder = html.Div(
+        [html.Div(question, style={'textAlign': 'center', 'fontSize': '20px', 'color': '#1f2a44',
+                                   'fontFamily': 'Helvetica, Arial, sans-serif', 'marginBottom': '5px'}),
+         html.Div("Rendering word cloud…", style={'height': '300px', 'lineHeight': '300px', 'color': '#7f8c8d',
+                                                  'backgroundColor': '#f7f7f7', 'borderRadius': '12px'})],
+        style={'textAlign': 'center', 'padding': '10px', 'margin': '0px auto', 'maxWidth': '1000px'}
+    )
+    request = {"col": col, "version": dataset["version"], **filters}
+    return html.Div([
+        dcc.Store(id={"type": "wordcloud-request", "col": col}, data=request),
+        html.Div(placeholder, id={"type": "wordcloud-slot", "col": col}),
+    ])
+
+def answers_unchanged(previous, dataset, question):
+    # A chart comes out the same when the counts it is drawn from are the same
+    old, new = previous["aggregates"], dataset["aggregates"]
+    if dataset["questions"][question]["chart"] == "service":
+        return old["yes_counts"].equals(new["yes_counts"]) and old["cooccurrence"].equals(new["cooccurrence"])
+    return old["counts"][question].equals(new["counts"][question])
+
+# Charts built when the data is loaded so the first visitor gets them warm
+def warm_sections(dataset, previous=None):
+    """The warm charts of every section, keyed by question (and by section name for the summaries).
+
+    Given the `previous` version of an appended dataset, the charts whose
+    counts did not change are taken over instead of built again.
+    """
+    header = dataset["header"]
+    # Their figures stay cached for as long as the dataset is served
+    pins = dataset["figures"] = figure_cache.pinned()
+    rendered_graphs = {}
+
+    def warm(name, key, build, questions):
+        if previous is not None and all(answers_unchanged(previous, dataset, question) for question in questions):
+            graph = previous["rendered_graphs"][name]
+            if CLIENTSIDE_CHARTS:
+                copy_counts(previous["chart_counts"], dataset["chart_counts"], str(key))
+            else:
+                pins.keys.update(figure_digests(graph))
+        elif CLIENTSIDE_CHARTS:
+            # Only the answers are kept, sent once per page load in the counts store
+            graph = extract_counts(build(), dataset["chart_counts"], str(key))
+        else:
+            graph = detach_figures(build(), figure_cache, key, pins)
+        rendered_graphs[name] = graph
+
+    for section_columns in sections.values():
+        for col in section_columns:
+            if col not in wordcloud_cols:
+                question = header[col]
+                warm(question, col, lambda: create_graph_for_question(dataset, question), [question])
+    # Ranked statements of each section, keyed by the section name
+    for i, section in enumerate(section_scales):
+        warm(section, f"summary-{i}", lambda: create_section_summary(dataset, section), summary_questions(section))
+    return rendered_graphs
+
+def history_files():
+    # Earlier exports first, the live file last
+    return sorted(glob.glob(history_pattern)) + [file_path]
+
+def warm_trends(header, file_paths, pins):
+    snapshots = trend_engine.refresh(file_paths)
+    return [detach_figures(create_trend_chart(trend_frame(snapshots, col), header[col], categorical_cols[col]),
+                           figure_cache, f"trend-{col}", pins)
+            for col in likert_cols]
+
+def aggregate_answers(df, header):
+    """Counts for every section and the term index of every word cloud question."""
+    store = build_aggregate_store(df, header, sections, category_orders, fill_values, extra_hist_cols,
+                                  text_cols=wordcloud_cols, filter_cols=list(filter_cols.values()))
+    terms = {header[col]: build_term_index(df[header[col]], custom_stopwords) for col in wordcloud_cols}
+    return store, terms
+
+def append_answers(store, terms, df, header):
+    # Only the rows of `df` are counted and tokenized
+    store = append_to_store(store, df, header, category_orders, fill_values)
+    terms = {question: append_term_index(index, df[question]) for question, index in terms.items()}
+    return store, terms
+
+def aggregate_in_chunks(file_path):
+    """Aggregates an export CSV_CHUNK_ROWS rows at a time, giving the same counts as a whole-file read."""
+    header = read_header(file_path)
+    store = terms = None
+    for df in iter_survey_chunks(file_path, used_cols, categorical_cols, CSV_CHUNK_ROWS):
+        if store is None:
+            store, terms = aggregate_answers(df, header)
+        else:
+            store, terms = append_answers(store, terms, df, header)
+    if store is None:  # No answers yet
+        df, header = load_survey(file_path, used_cols, categorical_cols)
+        store, terms = aggregate_answers(df, header)
+    return store, terms, header
+
+def load_dataset(file_path, trends=True):
+    """Parses the survey export and precomputes everything the tabs need.
+
+    Without `trends` the trends tab is left to the live dataset, which
+    charts every export anyway.
+    """
+    if CSV_CHUNK_ROWS:
+        store, terms, header = aggregate_in_chunks(file_path)
+    else:
+        df, header = load_survey(file_path, used_cols, categorical_cols)
+        store, terms = aggregate_answers(df, header)
+    dataset = {
+        "header": header,  # Full CSV header, maps column positions to questions
+        # Fails on column drift, before anything is charted from the wrong column
+        "questions": compile_dispatch(question_registry, header),
+        "respondent_count": store["row_count"],
+        # Counts for every section are computed once here, not on each tab click
+        "aggregates": store,
+        # Free-text answers are tokenized once, word clouds sum their term counts
+        "terms": terms,
+        "chart_counts": new_counts_payload(),  # Filled by warm_sections in clientside mode
+    }
+    dataset["rendered_graphs"] = warm_sections(dataset)
+    # Only the trends tab needs them; a deferred startup leaves them to its first visit
+    dataset["trend_figures"] = figure_cache.pinned()
+    dataset["rendered_trends"] = (None if DEFERRED_LOAD or not trends
+                                  else warm_trends(header, history_files(), dataset["trend_figures"]))
+    return dataset
+
+def ingest_batches(dataset):
+    """A copy of the dataset with the answers of new batch files appended, None when there are none.
+
+    Only the new rows are parsed and counted; the trends keep following
+    the exports.
+    """
+    paths = pending_batches(INGEST_DIR, dataset)
+    if not paths:
+        return None
+
+    header = dataset["header"]
+    store, terms = dataset["aggregates"], dataset["terms"]
+    ingested = set(dataset.get("ingested", ()))
+    version = hashlib.sha256(dataset["version"].encode("utf-8"))
+    for path in paths:
+        ingested.add(os.path.basename(path))  # A broken batch is not retried on every poll
+        try:
+            key = batch_key(path)
+            df = read_batch(path, header, used_cols, categorical_cols)
+        except (OSError, ValueError) as e:
+            print(f"Skipped batch {path}: {e}")
+            continue
+        store, terms = append_answers(store, terms, df, header)
+        version.update(key.encode("utf-8"))
+
+    previous = dataset
+    dataset = {**dataset, "ingested": frozenset(ingested),
+               "export_modified": dataset.get("export_modified", dataset["modified"])}
+    if store is dataset["aggregates"]:
+        return dataset  # Only broken batches
+    dataset.update({
+        "aggregates": store,
+        "terms": terms,
+        "respondent_count": store["row_count"],
+        "chart_counts": new_counts_payload(),
+        "version": version.hexdigest(),
+        "modified": datetime.datetime.now(),
+    })
+    # Only the charts of questions the batches changed are built again
+    dataset["rendered_graphs"] = warm_sections(dataset, previous)
+    return dataset
+
+def deferred_load_done(seconds):
+    # The survey data loaded in the background, after the rest of the startup
+    startup_profile.record("survey data (deferred)", seconds)
+    if STARTUP_PROFILE:
+        print(startup_profile.startup_report())
+
+startup_profile.mark("question registry and helpers")
+dataset_reloader = DatasetReloader(file_path, load_dataset, interval=RELOAD_INTERVAL, extend=ingest_batches,
+                                   load_now=not DEFERRED_LOAD, on_load=deferred_load_done if DEFERRED_LOAD else None)
+if not DEFERRED_LOAD:
+    startup_profile.mark("survey data")
+# Preloaded by gunicorn (gunicorn.conf.py), the watcher runs in the master, which rebuilds once
+# and restarts the workers on every change; request_extend then has no watcher to wake in a worker
+if os.environ.get("DASHBOARD_PRELOAD") != "1":
+    dataset_reloader.start()
+register_ingest_route(server, INGEST_DIR, INGEST_TOKEN, lambda: dataset_reloader.current,
+                      dataset_reloader.request_extend)
+
+def load_earlier_export(path):
+    dataset = load_dataset(path, trends=False)
+    dataset["export_date"] = snapshot_date(path)  # Shown by the counter; the file's mtime is when it was copied
+    return dataset
+
+# Earlier exports are built on their first selection and dropped again, least recently selected first
+dataset_cache = DatasetCache(load_earlier_export, max_bytes=DATASET_CACHE_MB * 1024 * 1024)
+
+def survey_exports():
+    """Selectable exports by selector value: the live file, then the earlier ones from the newest."""
+    exports = {LIVE_DATASET: {"path": file_path, "label": "Live export"}}
+    for path in sorted(glob.glob(history_pattern), key=snapshot_date, reverse=True):
+        exports[os.path.basename(path)] = {"path": path, "label": f"Export of {snapshot_date(path).strftime('%d-%m-%Y')}"}
+    return exports
+
+def dataset_for(dataset_id):
+    # Values come from the browser; anything but a known earlier export shows the live data
+    export = survey_exports().get(dataset_id)
+    if export is None or dataset_id == LIVE_DATASET:
+        return dataset_reloader.current
+    return dataset_cache.get(export["path"])
+
+def counter_children(dataset):
+    return [f"Respondent Count: {dataset['respondent_count']}", html.Br(),
+            f"Latest update: {dataset.get('export_date', dataset['modified']).strftime('%d-%m-%Y')}"]
+
+def filter_options(dataset, filter_id):
+    return list(dataset["aggregates"]["bitmaps"][dataset["header"][filter_cols[filter_id]]])
+
+
+def serve_layout():
+    # Built on every page load so the counter and date follow the reloaded data
+    if not dataset_reloader.ready and not has_request_context():
+        return layout_for(None)  # Validated by Dash at startup, before a deferred load finished
+    return layout_for(dataset_reloader.current)
+
+def layout_for(dataset):
+    return html.Div(
+        style={"fontFamily": "Arial, sans-serif", "margin": "24px"},
+        children=[
+            # Container for the image and title
+            html.Div(
+                style={
+                    "display": "flex",  # Flexbox for side-by-side layout
+                    "alignItems": "center",  # Vertically align items
+                    "marginBottom": "20px"  # Adds space below this section
+                },
+                children=[
+                    # Responsive image
+                    html.Img(
+                        src='assets/EOSC _ BlueCloud2026_Payoff_ColourPos.png',  # Replace with your image file path
+                        style={
+                            "width": "35%",  # Larger width for better visibility
+                            "height": "auto",  # Maintain aspect ratio
+                            "maxWidth": "600px",  # Ensure image doesn't get too large
+                            "marginRight": "20px"  # Add space between image and title
+                        }
+                    ),
+            # Title of the app
+                    html.Div(
+                        children=[
+                            html.H1(
+                                "Stakeholder Consultation Survey Dashboard",
+                                style={
+                                    "textAlign": "left",  # Align text to the left
+                                    "color": "#2c3e50",
+                                    "fontSize": "28px"  # Slightly larger font size for prominence
+                                }
+                            ),
+                            html.P(
+                                "Explore the survey results through interactive visualizations.",
+                                style={
+                                    "textAlign": "left",
+                                    "color": "#7f8c8d",
+                                    "fontSize": "16px"
+                                }
+                            ),
+                        ]
+                    )
+                ]
+            ),
+            # Pick the export to explore, then restrict every section to some professional groups and/or sectors
+            html.Div(
+                style={"display": "flex", "gap": "20px", "marginBottom": "20px"},
+                children=[
+                    dcc.Dropdown(
+                        id="dataset-select",
+                        options=[{"label": export["label"], "value": dataset_id}
+                                 for dataset_id, export in survey_exports().items()],
+                        value=LIVE_DATASET,
+                        clearable=False,
+                        style={"flex": "1"},
+                    )
+                ] + [
+                    dcc.Dropdown(
+                        id=filter_id,
+                        options=filter_options(dataset, filter_id) if dataset else [],
+                        multi=True,
+                        placeholder=f"Filter by {label}",
+                        style={"flex": "1"},
+                    ) for filter_id, label in [("filter-group", "professional group"), ("filter-sector", "sector")]
+                ]
+            ),
+            # Sections already rendered in this browser, with the data version and filters they show
+            dcc.Store(id="rendered-sections", storage_type="memory",
+                      data={COUNTS_VERSION: dataset["version"]} if dataset and CLIENTSIDE_CHARTS else {}),
+            # Answers of the unfiltered charts, for the browser to draw them (CLIENTSIDE_CHARTS)
+            dcc.Store(id="chart-counts", storage_type="memory", data=dataset["chart_counts"] if dataset else None),
+            # Create tabs for each section
+            dcc.Tabs(
+                id="tabs",
+                value="Section 1: About the Respondent",
+                children=[
+                    dcc.Tab(
+                        label=section,
+                        value=section,
+                        children=[
+                            # Use the subtitle dictionary to fetch a custom subtitle for each section
+                            html.H2(
+                                section_subtitles.get(section, "Explore this section for detailed insights."),  # Default subtitle if not found
+                                style={"textAlign": "center", "fontSize": "20px", "color": "#34495e"}
+                            ),
+                            html.Div(
+                                id="respondent-counter",
+                                children=counter_children(dataset) if dataset else [],
+                                style=COUNTER_STYLE
+                            ) if section == "Section 1: About the Respondent" else None,
                                                 
-                        html.Div(
-                            id=f"graphs-{section}",
-                            style=SECTION_LAYOUT,   
-                        ),
-                    ]
-                ) for section in sections
-            ]
-        ),
-    ]
-)
+                            html.Div(
+                                id=f"graphs-{section}",
+                                style=SECTION_LAYOUT,   
+                            ),
+                        ]
+                    ) for section in sections
+                ] + [
+                    dcc.Tab(
+                        label=TRENDS_TAB,
+                        value=TRENDS_TAB,
+                        children=[
+                            html.H2(
+                                "How the answers evolved across the successive exports of the consultation",
+                                style={"textAlign": "center", "fontSize": "20px", "color": "#34495e"}
+                            ),
+                            html.Div(
+                                id=f"graphs-{TRENDS_TAB}",
+                                style=SECTION_LAYOUT,
+                            ),
+                        ]
+                    )
+                ]
+            ),
+        ]
+    )
 
-@app.callback(
-    [Output(f"graphs-{section}", "children") for section in sections],
-    [Input("tabs", "value")]
-)
+app.layout = serve_layout
 
-def update_graphs_by_section(selected_section):
-    print(f"Selected section: {selected_section}")  # Debugging: check which section was selected
-    section_columns = sections[selected_section]
-    graphs = {section: [] for section in sections}
+def render_section(dataset, section, mask=None, filters=None):
+    """Builds the graphs of a single section, for the filtered respondents when a mask is given.
 
-    if selected_section == "Extra Section: Blue cloud Services usage":
-        # Create the combined histogram for the extra section
-        graphs[selected_section].append(create_yes_histogram(df, extra_hist_cols))
+    Uncached word clouds are left to background jobs when `filters` (the
+    dropdown values they are drawn for) are given.
+    """
+    header = dataset["header"]
+    rendered_graphs = dataset["rendered_graphs"]
+    section_graphs = []
 
-    for col in section_columns:
-            question = df.columns[col]
-            question_index = df.columns.get_loc(question)
-            if question_index in wordcloud_cols:
-                graph = generate_wordcloud_for_question(question)
+    if mask is not None:
+        section_graphs.append(html.Div(
+            f"Showing {int(mask.sum())} of {dataset['respondent_count']} respondents",
+            style={**COUNTER_STYLE, "flex": "1 100%"}
+        ))
+    if section in section_scales:
+        summary = rendered_graphs[section] if mask is None else create_section_summary(dataset, section, mask)
+        section_graphs.append(html.Div(children=[summary], style=DIV5_STYLE))
+
+    for col in sections[section]:
+            question = header[col]
+            if col in wordcloud_cols:
+                placeholder = wordcloud_job(dataset, col, filters) if WORDCLOUD_JOBS and filters is not None else None
+                graph = generate_wordcloud_for_question(dataset, question, mask, placeholder)
+                style = DIV5_STYLE
+            elif section == "Extra Section: Blue cloud Services usage":
+                # Services histogram and co-occurrence heatmap, built only once
+                graph = rendered_graphs[question] if mask is None else create_graph_for_question(dataset, question, mask)
                 style = DIV5_STYLE
             else:
-                graph = create_graph_for_question(question)
+                # Unfiltered charts were built at load time, filtered ones only need a bincount
+                graph = rendered_graphs[question] if mask is None else create_graph_for_question(dataset, question, mask)
                 style = DIV_STYLE
 
-            graphs[selected_section].append(html.Div(children=[graph], style=style))
+            section_graphs.append(html.Div(children=[graph], style=style))
+
+    return html.Div(
+        children=section_graphs, 
+        style=({"width": "100%"} if section == "Extra Section: Blue cloud Services usage" else SECTION_LAYOUT)
+    )
 
-    # Ensure proper structure for the selected section's graphs
-    return [html.Div(
-        children=graphs[section], 
-        style=({"width": "100%"} if selected_section == "Extra Section: Blue cloud Services usage" else SECTION_LAYOUT)
+def render_trends(dataset):
+    if dataset["rendered_trends"] is None:
+        dataset["rendered_trends"] = warm_trends(dataset["header"], history_files(), dataset["trend_figures"])
+    return html.Div(
+        children=[html.Div(children=[graph], style=DIV_STYLE) for graph in dataset["rendered_trends"]],
+        style=SECTION_LAYOUT
     )
-    for section in sections
-]   
-    
+
+def render_tab(dataset, tab, mask=None, filters=None):
+    # The trends chart every export, whichever one is selected
+    return render_trends(dataset_reloader.current) if tab == TRENDS_TAB else render_section(dataset, tab, mask, filters)
+
+tabs = list(sections) + [TRENDS_TAB]
+
+@app.callback(
+    [Output(f"graphs-{tab}", "children") for tab in tabs] + [Output("rendered-sections", "data"), Output("chart-counts", "data")],
+    [Input("tabs", "value")] + [Input(filter_id, "value") for filter_id in filter_cols] + [Input("dataset-select", "value")],
+    [State("rendered-sections", "data")]
+)
+# The section comes from the client, only the known tabs get a series of their own
+@metrics.timed("dashboard_callback_seconds", label_args={"section": "selected_section"},
+               label_values={"section": tabs}, callback="update_graphs_by_section")
+def update_graphs_by_section(selected_section, groups, sectors, dataset_id, rendered_sections):
+    dataset = dataset_for(dataset_id)  # Read once, a reload may swap it meanwhile
+    rendered_sections = rendered_sections or {}
+    header = dataset["header"]
+    selections = {header[filter_cols["filter-group"]]: groups, header[filter_cols["filter-sector"]]: sectors}
+    render_state = [dataset["version"], sorted(groups or []), sorted(sectors or [])]
+
+    # Only the active section is built and sent; sections the browser already
+    # holds for the current data and filters, and all the other tabs, are left untouched
+    if rendered_sections.get(selected_section) == render_state:
+        return [no_update for tab in tabs] + [no_update, no_update]
+
+    mask = filter_mask(dataset["aggregates"], selections)
+    filters = {"dataset": dataset_id, "groups": groups, "sectors": sectors}
+    rendered_sections = {**rendered_sections, selected_section: render_state}
+    # Charts drawn in the browser come with the counts of their version, e.g. after a reload or an ingest
+    counts = no_update
+    if CLIENTSIDE_CHARTS and rendered_sections.get(COUNTS_VERSION) != dataset["version"]:
+        counts = dataset["chart_counts"]
+        rendered_sections[COUNTS_VERSION] = dataset["version"]
+    return [render_tab(dataset, tab, mask, filters) if tab == selected_section else no_update
+            for tab in tabs] + [rendered_sections, counts]
+
+if WORDCLOUD_JOBS:
+    # Each placeholder's request runs as its own job process, so the clouds of a section render in parallel
+    @app.callback(
+        Output({"type": "wordcloud-slot", "col": MATCH}, "children"),
+        Input({"type": "wordcloud-request", "col": MATCH}, "data"),
+        background=True,
+    )
+    def render_wordcloud_job(request):
+        before = metrics.snapshot() if job_metrics is not None else None
+        try:
+            dataset = dataset_for(request["dataset"])
+            if dataset["version"] != request["version"]:
+                # Reloaded since the placeholder, the cloud would not match the section around it
+                return html.Div("The survey data changed meanwhile; select the tab again for this word cloud.",
+                                style={"color": "red"})
+            header = dataset["header"]
+            selections = {header[filter_cols["filter-group"]]: request["groups"],
+                          header[filter_cols["filter-sector"]]: request["sectors"]}
+            mask = filter_mask(dataset["aggregates"], selections)
+            # The PNG also lands in the disk cache, where the section callback finds it next time
+            return generate_wordcloud_for_question(dataset, header[request["col"]], mask)
+        finally:
+            if job_metrics is not None:
+                job_metrics.append(metrics.samples_since(before))
+
+@app.callback(
+    [Output("respondent-counter", "children")]
+    + [Output(filter_id, prop) for filter_id in filter_cols for prop in ("options", "value")],
+    Input("dataset-select", "value"),
+    prevent_initial_call=True,
+)
+def switch_dataset(dataset_id):
+    """Counter and filter choices of the selected export; the filters start over.
+
+    Its chart counts come with its graphs, from the section callback.
+    """
+    dataset = dataset_for(dataset_id)
+    filters = [value for filter_id in filter_cols for value in (filter_options(dataset, filter_id), None)]
+    return [counter_children(dataset)] + filters
+
+# Warm charts only carry the URL of their figure, the browser fetches and caches it
+app.clientside_callback(
+    ClientsideFunction(namespace="figures", function_name="fetch_figure"),
+    Output({"type": "cached-figure", "src": MATCH}, "figure"),
+    Input({"type": "cached-figure", "src": MATCH}, "id"),
+)
+
+# In clientside mode, charts are drawn from the counts store, and drawn again whenever it changes
+app.clientside_callback(
+    ClientsideFunction(namespace="charts", function_name="build_figure"),
+    Output({"type": "client-chart", "key": MATCH}, "figure"),
+    Input({"type": "client-chart", "key": MATCH}, "id"),
+    Input("chart-counts", "data"),
+)
+
+startup_profile.mark("layout and callbacks")
+if STARTUP_PROFILE:
+    print(startup_profile.startup_report())
+
 # Run the app
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,219 @@
+import numpy as np
+import pandas as pd
+
+
+def fill_missing(series, fill_value):
+    if isinstance(series.dtype, pd.CategoricalDtype) and fill_value not in series.cat.categories:
+        series = series.cat.add_categories([fill_value])
+    return series.fillna(fill_value)
+
+def ordered_value_counts(series, category_order=None, fill_value=None):
+    """Counts the answers of one column and returns them in chart order."""
+    if fill_value is not None:
+        series = fill_missing(series, fill_value)
+    counts = series.value_counts()
+    # Categorical columns also report the categories nobody picked
+    counts = counts[counts > 0]
+    counts.index = counts.index.astype(object)
+    return in_chart_order(counts, category_order)
+
+def in_chart_order(counts, category_order=None):
+    if category_order is None:
+        return counts
+
+    # Known categories keep their natural order, unexpected answers go last
+    order = [category for category in category_order if category in counts.index]
+    order += [category for category in counts.index if category not in order]
+    return counts.reindex(order)
+
+def encode_yes_no(df, questions):
+    """Encodes Yes/No columns as one int8 matrix: 1 for Yes, 0 for No, -1 for blank."""
+    matrix = np.full((df.shape[0], len(questions)), -1, dtype=np.int8)
+    for j, question in enumerate(questions):
+        matrix[(df[question] == "Yes").to_numpy(), j] = 1
+        matrix[(df[question] == "No").to_numpy(), j] = 0
+    return matrix
+
+def count_yes_no_blank(matrix, questions):
+    """Yes, No and blank counts of every column in a single bincount over the matrix."""
+    n_columns = len(questions)
+    # Each cell becomes column * 3 + answer, answer being 0 blank, 1 No, 2 Yes
+    keys = (matrix.astype(np.intp) + 1) + 3 * np.arange(n_columns)
+    counts = np.bincount(keys.ravel(), minlength=3 * n_columns).reshape(n_columns, 3)
+    return pd.DataFrame({
+        "Column": questions,
+        "Yes Count": counts[:, 2],
+        "No Count": counts[:, 1],
+        "Blank Count": counts[:, 0],
+    })
+
+def count_cooccurrence(matrix, questions):
+    """Respondents answering Yes to both columns of every pair, Yes counts on the diagonal."""
+    yes = (matrix == 1).astype(np.int32)
+    return pd.DataFrame(yes.T @ yes, index=questions, columns=questions)
+
+def encode_column(series, labels):
+    """Position of every answer in `labels`, -1 for answers that are not counted."""
+    return pd.Categorical(series, categories=labels).codes
+
+def build_bitmap_index(labels, codes):
+    """One boolean mask per answer, so filters combine with plain & and |."""
+    return {label: codes == i for i, label in enumerate(labels)}
+
+def build_aggregate_store(df, header, sections, category_orders, fill_values, yes_cols, text_cols=(), filter_cols=()):
+    """Counts every column used by the sections once, when the CSV is loaded.
+
+    Chart builders only read from the returned store, so a tab switch never
+    has to go back to the dataframe. Each counted column is also kept as
+    integer codes, and `filter_cols` get a bitmap per answer, so counts
+    for a filtered subset of respondents are a mask and a bincount.
+    Free-text `text_cols` are left to the word clouds.
+    """
+    counts = {}
+    codes = {}
+    for section_columns in sections.values():
+        for col in section_columns:
+            if col in text_cols:
+                continue
+            question = header[col]
+            series = df[question]
+            if col in fill_values:
+                series = fill_missing(series, fill_values[col])
+            counts[question] = ordered_value_counts(series, category_order=category_orders.get(col))
+            labels = list(counts[question].index)
+            codes[question] = (labels, encode_column(series, labels))
+
+    yes_questions = [header[col] for col in yes_cols]
+    yes_matrix = encode_yes_no(df, yes_questions)
+    return {
+        "row_count": df.shape[0],
+        "counts": counts,
+        "codes": codes,
+        "bitmaps": {header[col]: build_bitmap_index(*codes[header[col]]) for col in filter_cols},
+        "yes_questions": yes_questions,
+        "yes_matrix": yes_matrix,
+        "yes_counts": count_yes_no_blank(yes_matrix, yes_questions),
+        "cooccurrence": count_cooccurrence(yes_matrix, yes_questions),
+    }
+
+def filter_mask(store, selections):
+    """Rows matching any selected answer of every filtered question, None when nothing is selected."""
+    mask = None
+    for question, values in selections.items():
+        if not values:
+            continue
+        bitmaps = store["bitmaps"][question]
+        question_mask = np.zeros(store["row_count"], dtype=bool)
+        for value in values:
+            if value in bitmaps:
+                question_mask |= bitmaps[value]
+        mask = question_mask if mask is None else mask & question_mask
+    return mask
+
+def filtered_counts(store, question, mask):
+    """Same counts and order as the store, restricted to the rows in `mask`."""
+    labels, codes = store["codes"][question]
+    selected = codes[mask]
+    counts = pd.Series(np.bincount(selected[selected >= 0], minlength=len(labels)), index=labels)
+    # Appended answers keep the codes of the order they were first seen in, not the chart order
+    counts = counts.reindex(store["counts"][question].index)
+    return counts[counts > 0]
+
+def yes_summary(store, mask=None):
+    """Yes-counts and co-occurrence of the services, for the rows in `mask` when given."""
+    if mask is None:
+        return store["yes_counts"], store["cooccurrence"]
+    matrix = store["yes_matrix"][mask]
+    return count_yes_no_blank(matrix, store["yes_questions"]), count_cooccurrence(matrix, store["yes_questions"])
+
+
+class RowBuffer:
+    """Array with spare rows at the end, so appends do not copy what is already there.
+
+    `view` only covers the rows appended so far, and arrays handed out
+    earlier keep showing exactly the rows they had. Capacity doubles when
+    it runs out, which keeps appends proportional to the new rows.
+    """
+
+    def __init__(self, array):
+        self._data = array
+        self.length = len(array)
+
+    @property
+    def view(self):
+        return self._data[:self.length]
+
+    def append(self, rows):
+        end = self.length + len(rows)
+        if end > len(self._data) or not np.can_cast(rows.dtype, self._data.dtype):
+            grown = np.empty((max(end, 2 * len(self._data)),) + self._data.shape[1:],
+                             dtype=np.result_type(self._data, rows))
+            grown[:self.length] = self._data[:self.length]
+            self._data = grown
+        self._data[self.length:end] = rows
+        self.length = end
+        return self.view
+
+def _append(buffers, key, array, rows):
+    # A buffer that already holds rows past `array` belongs to a newer store; `array` then starts its own
+    if key not in buffers or buffers[key].length != len(array):
+        buffers[key] = RowBuffer(array)
+    return buffers[key].append(rows)
+
+def append_to_store(store, df, header, category_orders, fill_values):
+    """A new store with the rows of `df` added, leaving `store` untouched.
+
+    Only the new rows are counted and encoded; counts, Yes-counts and the
+    co-occurrence matrix are updated by addition. Answers never seen before
+    get new labels after the known ones, like unexpected answers at load.
+    """
+    row_count = store["row_count"] + df.shape[0]
+    buffers = dict(store.get("buffers", {}))
+    counts = dict(store["counts"])
+    codes = dict(store["codes"])
+    bitmaps = {question: dict(label_bitmaps) for question, label_bitmaps in store["bitmaps"].items()}
+
+    for question, (labels, old_codes) in store["codes"].items():
+        col = header.index(question)
+        series = df[question]
+        if col in fill_values:
+            series = fill_missing(series, fill_values[col])
+        new_labels = [label for label in series.dropna().unique() if label not in labels]
+        labels = labels + new_labels
+        new_codes = np.asarray(encode_column(series, labels))
+        codes[question] = (labels, _append(buffers, ("codes", question), old_codes, new_codes))
+
+        added = pd.Series(np.bincount(new_codes[new_codes >= 0], minlength=len(labels)), index=labels)
+        total = counts[question].reindex(labels, fill_value=0) + added
+        total = total[total > 0]
+        # Same order as value_counts on the sorted categories of a full load
+        total = total.sort_index(kind="stable").sort_values(ascending=False, kind="stable")
+        counts[question] = in_chart_order(total, category_orders.get(col))
+
+        if question in bitmaps:
+            for i, label in enumerate(labels):
+                rows = new_codes == i
+                if label in bitmaps[question]:
+                    bitmaps[question][label] = _append(buffers, ("bitmap", question, label),
+                                                       bitmaps[question][label], rows)
+                else:
+                    bitmaps[question][label] = np.concatenate([np.zeros(store["row_count"], dtype=bool), rows])
+
+    yes_questions = store["yes_questions"]
+    new_matrix = encode_yes_no(df, yes_questions)
+    added_yes = count_yes_no_blank(new_matrix, yes_questions)
+    yes_counts = store["yes_counts"].copy()
+    for column in ("Yes Count", "No Count", "Blank Count"):
+        yes_counts[column] = yes_counts[column] + added_yes[column]
+
+    return {
+        **store,
+        "row_count": row_count,
+        "buffers": buffers,
+        "counts": counts,
+        "codes": codes,
+        "bitmaps": bitmaps,
+        "yes_matrix": _append(buffers, "yes_matrix", store["yes_matrix"], new_matrix),
+        "yes_counts": yes_counts,
+        "cooccurrence": store["cooccurrence"] + count_cooccurrence(new_matrix, yes_questions),
+    }
@@ -0,0 +1,18 @@
+// Rebuilds charts from the counts store, without asking the server.
+// Each chart only carries its answers; the traces and layout shared by
+// charts of the same kind are stored once, as built by the Python builders.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    charts: {
+        build_figure: function (id, payload) {
+            const chart = payload && payload.charts[id.key];
+            if (!chart) {
+                return window.dash_clientside.no_update;
+            }
+            const kind = payload.kinds[chart.kind];
+            return {
+                data: kind.data.map((trace, i) => Object.assign({}, trace, chart.data[i])),
+                layout: Object.assign({template: payload.template}, kind.layout)
+            };
+        }
+    }
+});
@@ -0,0 +1,55 @@
+import hashlib
+import json
+
+import plotly.io as pio
+from dash import dcc
+
+# Trace fields holding a question's answers; the rest of a trace is shared by every chart of its kind
+DATA_FIELDS = {
+    "pie": ("labels", "values", "customdata", "marker"),
+    "bar": ("x", "y", "text", "customdata", "marker", "error_x"),
+    "heatmap": ("x", "y", "z", "text"),
+}
+
+
+def new_counts_payload():
+    """Empty payload of the chart counts store, filled by extract_counts."""
+    return {"template": None, "kinds": {}, "charts": {}}
+
+def copy_counts(source, payload, key):
+    """Copies the answers of the graphs extracted under `key` from another payload, for a reused graph."""
+    payload["template"] = payload["template"] or source["template"]
+    for chart_key, chart in source["charts"].items():
+        if chart_key == key or chart_key.startswith(f"{key}-"):
+            payload["charts"][chart_key] = chart
+            payload["kinds"].setdefault(chart["kind"], source["kinds"][chart["kind"]])
+
+def extract_counts(component, payload, key):
+    """Moves the answers of every dcc.Graph below `component` into `payload`.
+
+    Each figure is split into its per-question fields (labels, counts and
+    their colours) and its kind: the traces and layout that the chart
+    builder gives every chart of that type, stored once. The graphs are
+    left with an id for the browser to rebuild their figure from the payload.
+    """
+    if isinstance(component, dcc.Graph) and getattr(component, "figure", None) is not None:
+        figure = json.loads(pio.to_json(component.figure, validate=False, engine="orjson"))
+        layout = figure.get("layout", {})
+        payload["template"] = layout.pop("template", payload["template"])  # The same for every chart
+
+        data = []
+        for trace in figure["data"]:
+            fields = DATA_FIELDS.get(trace.get("type"), ())
+            data.append({field: trace.pop(field) for field in fields if field in trace})
+        kind = {"data": figure["data"], "layout": layout}
+        digest = hashlib.sha256(json.dumps(kind, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        payload["kinds"].setdefault(digest, kind)
+        payload["charts"][key] = {"kind": digest, "data": data}
+        return dcc.Graph(id={"type": "client-chart", "key": key})
+
+    children = getattr(component, "children", None)
+    if isinstance(children, (list, tuple)):
+        component.children = [extract_counts(child, payload, f"{key}-{i}") for i, child in enumerate(children)]
+    elif children is not None and hasattr(children, "to_plotly_json"):
+        component.children = extract_counts(children, payload, key)
+    return component
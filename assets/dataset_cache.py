@@ -0,0 +1,109 @@
+import datetime
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from assets.metrics import metrics
+from assets.reloader import file_fingerprint
+
+DATASET_HIT = metrics.series("dashboard_cache_requests_total", cache="dataset", result="hit")
+DATASET_MISS = metrics.series("dashboard_cache_requests_total", cache="dataset", result="miss")
+
+
+def estimate_nbytes(obj, seen=None):
+    """Rough memory footprint of a dataset: array and frame buffers plus the Python objects around them.
+
+    Arrays sharing a buffer (views of a RowBuffer) count it once.
+    """
+    seen = set() if seen is None else seen
+    if isinstance(obj, np.ndarray):
+        while isinstance(obj.base, np.ndarray):
+            obj = obj.base
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return int(np.sum(obj.memory_usage(deep=True)))
+    if isinstance(obj, pd.Index):
+        return obj.memory_usage(deep=True)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return size + sum(estimate_nbytes(key, seen) + estimate_nbytes(value, seen) for key, value in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return size + sum(estimate_nbytes(item, seen) for item in obj)
+    if isinstance(getattr(obj, "__dict__", None), dict):  # Row buffers, Dash components
+        return size + estimate_nbytes(vars(obj), seen)
+    return size
+
+
+class DatasetCache:
+    """LRU of datasets built on demand from survey exports, bounded by their estimated memory.
+
+    Once the datasets held add up to more than `max_bytes`, the least
+    recently selected ones are dropped and rebuilt on their next request;
+    the dataset just built always stays, even alone over the ceiling. A
+    dataset whose export changed on disk is built again.
+    """
+
+    def __init__(self, build, max_bytes):
+        self.build = build
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # File path -> (dataset, estimated bytes)
+        self._lock = threading.Lock()
+        self._building = {}  # File path -> lock, so concurrent requests build a dataset once
+
+    def get(self, file_path):
+        dataset = self._lookup(file_path)
+        if dataset is not None:
+            return dataset
+
+        with self._lock:
+            build_lock = self._building.setdefault(file_path, threading.Lock())
+        with build_lock:
+            dataset = self._lookup(file_path)  # Built by another request meanwhile
+            if dataset is not None:
+                return dataset
+
+            metrics.inc(DATASET_MISS)
+            mtime, version = file_fingerprint(file_path)
+            dataset = self.build(file_path)
+            dataset["version"] = version
+            dataset["modified"] = datetime.datetime.fromtimestamp(mtime)
+            nbytes = estimate_nbytes(dataset)
+            with self._lock:
+                self._entries[file_path] = (dataset, nbytes)
+                self._evict(keep=file_path)
+                self._building.pop(file_path, None)
+            return dataset
+
+    def _lookup(self, file_path):
+        with self._lock:
+            entry = self._entries.get(file_path)
+            if entry is None:
+                return None
+            if entry[0]["modified"] != datetime.datetime.fromtimestamp(os.path.getmtime(file_path)):
+                del self._entries[file_path]
+                return None
+            self._entries.move_to_end(file_path)
+            metrics.inc(DATASET_HIT)
+            return entry[0]
+
+    def _evict(self, keep):
+        total = sum(nbytes for _, nbytes in self._entries.values())
+        for file_path in list(self._entries):
+            if total <= self.max_bytes:
+                break
+            if file_path != keep:
+                total -= self._entries.pop(file_path)[1]
+
+    def usage(self):
+        """Estimated bytes of every dataset held, from the least recently used."""
+        with self._lock:
+            return [(file_path, nbytes) for file_path, (_, nbytes) in self._entries.items()]
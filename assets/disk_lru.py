@@ -0,0 +1,148 @@
+import os
+import re
+import threading
+import weakref
+from collections import OrderedDict
+
+from flask import Response, abort, request
+
+from assets.metrics import metrics
+
+
+class PinnedKeys:
+    """Keys of the entries one holder hands out, kept by the cache while the set is alive."""
+
+    def __init__(self):
+        self.keys = set()
+
+
+class DiskLRU:
+    """Bounded LRU of content-addressed bytes, in memory and optionally on disk.
+
+    With a cache directory every entry is also written to a file named
+    after its key, where every worker finds it and which survives a
+    restart. Both levels evict the least recently used entries once they
+    are full, except the keys of a live PinnedKeys (see `pinned`).
+    Lookups are counted in dashboard_cache_requests_total under `name`.
+    """
+
+    def __init__(self, name, extension, url_prefix, max_entries, cache_dir=None, max_disk_entries=512):
+        self.extension = extension
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        self.url_prefix = url_prefix
+        self._hit, self._disk_hit, self._miss = (
+            metrics.series("dashboard_cache_requests_total", cache=name, result=result)
+            for result in ("hit", "disk_hit", "miss"))
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._pins = weakref.WeakSet()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def url(self, key):
+        return f"{self.url_prefix}{key}{self.extension}"
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}{self.extension}")
+
+    def pinned(self):
+        """A new PinnedKeys; dropping every reference to it unpins its entries."""
+        pins = PinnedKeys()
+        with self._lock:
+            self._pins.add(pins)
+        return pins
+
+    def _pinned_keys(self):
+        return set().union(*(pins.keys for pins in list(self._pins)))
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                metrics.inc(self._hit)
+                return body
+
+        if not self.cache_dir:
+            metrics.inc(self._miss)
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                body = f.read()
+            os.utime(path)  # Mark as recently used for disk eviction
+        except OSError:
+            metrics.inc(self._miss)
+            return None
+
+        metrics.inc(self._disk_hit)
+        self._remember(key, body)
+        return body
+
+    def put(self, key, body, pins=None):
+        if pins is not None:
+            pins.keys.add(key)
+        self._remember(key, body)
+        if not self.cache_dir:
+            return
+
+        path = self._disk_path(key)
+        try:
+            os.utime(path)  # Already written by this or another worker
+        except OSError:
+            # Write to a temporary file first so readers never see half an entry
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+            self._evict_disk()
+
+    def _remember(self, key, body):
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                pinned = self._pinned_keys()
+                unpinned = [entry for entry in self._entries if entry not in pinned]
+                for entry in unpinned[:len(self._entries) - self.max_entries]:
+                    del self._entries[entry]
+
+    def _evict_disk(self):
+        try:
+            files = [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith(self.extension)]
+        except OSError:
+            return
+        if len(files) <= self.max_disk_entries:
+            return
+
+        with self._lock:
+            pinned = {f"{key}{self.extension}" for key in self._pinned_keys()}
+        files.sort(key=lambda entry: entry.stat().st_mtime)
+        unpinned = [entry for entry in files if entry.name not in pinned]
+        for entry in unpinned[:len(files) - self.max_disk_entries]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass  # Another worker removed it first
+
+def register_cache_route(server, cache, key_pattern, mimetype, endpoint):
+    """Serves the entries of `cache` by URL with an ETag and long-lived cache headers."""
+
+    def serve(key):
+        # Anything but a well-formed key never reaches the file system
+        body = cache.get(key) if re.fullmatch(key_pattern, key) else None
+        if body is None:
+            abort(404)
+
+        response = Response(body, mimetype=mimetype)
+        # The key changes with the content, so browsers and proxies may keep it
+        response.set_etag(key)
+        response.cache_control.public = True
+        response.cache_control.max_age = 31536000
+        response.cache_control.immutable = True
+        return response.make_conditional(request)
+
+    server.add_url_rule(f"{cache.url_prefix}<key>{cache.extension}", endpoint=endpoint, view_func=serve)
+    return serve
@@ -0,0 +1,70 @@
+import hashlib
+import re
+
+import plotly.io as pio
+from dash import dcc
+
+from assets.disk_lru import DiskLRU, register_cache_route
+
+
+class FigureCache(DiskLRU):
+    """Bounded LRU of figures serialized once to ready-to-send JSON bytes.
+
+    Entries are addressed by the hash of their JSON, so a figure only gets a
+    new URL when the data behind it changed, and every worker serving the
+    same dataset version hands out the same URLs.
+
+    With a cache directory the figures are also written to disk, where
+    every worker finds them: a browser may fetch a URL from another worker
+    than the one that built the figure.
+
+    Figures put with a PinnedKeys (see `pinned`) are never evicted while the
+    set is referenced, so a dataset's URLs resolve for as long as it is served.
+    """
+
+    def __init__(self, max_entries=512, cache_dir=None, max_disk_entries=4096, url_prefix="/figures/"):
+        super().__init__("figure", ".json", url_prefix, max_entries, cache_dir, max_disk_entries)
+
+    def put(self, figure, pins=None):
+        """Serializes a figure and returns the URL it is served from."""
+        body = pio.to_json(figure, validate=False, engine="orjson").encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        super().put(digest, body, pins)
+        return self.url(digest)
+
+def detach_figures(component, cache, key, pins=None):
+    """Moves the figure of every dcc.Graph below `component` into the cache.
+
+    The graphs keep an id pointing at their cached figure, which the
+    browser fetches (and caches) on its own. `key` keeps ids unique when
+    two charts happen to have identical figures; `pins` keeps the figures
+    cached as long as whatever holds it.
+    """
+    if isinstance(component, dcc.Graph) and getattr(component, "figure", None) is not None:
+        return dcc.Graph(id={"type": "cached-figure", "src": f"{cache.put(component.figure, pins)}#{key}"})
+
+    children = getattr(component, "children", None)
+    if isinstance(children, (list, tuple)):
+        component.children = [detach_figures(child, cache, f"{key}-{i}", pins) for i, child in enumerate(children)]
+    elif children is not None and hasattr(children, "to_plotly_json"):
+        component.children = detach_figures(children, cache, key, pins)
+    return component
+
+def figure_digests(component):
+    """Digests of the cached figures below a component returned by detach_figures."""
+    component_id = getattr(component, "id", None)
+    if isinstance(component, dcc.Graph) and isinstance(component_id, dict) and component_id.get("type") == "cached-figure":
+        match = re.search(r"([0-9a-f]{32})\.json", component_id["src"])
+        return {match.group(1)} if match else set()
+
+    children = getattr(component, "children", None)
+    if isinstance(children, (list, tuple)):
+        return set().union(*(figure_digests(child) for child in children))
+    if children is not None and hasattr(children, "to_plotly_json"):
+        return figure_digests(children)
+    return set()
+
+def register_figure_route(server, cache):
+    """Serves cached figures with an ETag and long-lived cache headers."""
+    # Digests are 32 hex digits
+    return register_cache_route(server, cache, r"[0-9a-f]{32}", "application/json", "serve_figure")
@@ -0,0 +1,41 @@
+// Fetches the figures of warm charts from the server's figure cache.
+// The URL changes with the figure content, so the browser HTTP cache can
+// answer repeat visits without asking the server.
+const FIGURE_ATTEMPTS = 3;
+
+function unavailableFigure() {
+    // Shown instead of a blank chart once every attempt failed
+    return {
+        data: [],
+        layout: {
+            xaxis: {visible: false},
+            yaxis: {visible: false},
+            annotations: [{
+                text: "This chart could not be loaded, please reload the page.",
+                showarrow: false,
+                font: {size: 16, color: "#7f8c8d"}
+            }]
+        }
+    };
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    figures: {
+        fetch_figure: async function (id) {
+            for (let attempt = 1; attempt <= FIGURE_ATTEMPTS; attempt++) {
+                try {
+                    const response = await fetch(id.src, {credentials: "same-origin"});
+                    if (response.ok) {
+                        return response.json();
+                    }
+                } catch (error) {
+                    // Network error, tried again below
+                }
+                if (attempt < FIGURE_ATTEMPTS) {
+                    await new Promise(resolve => setTimeout(resolve, 500 * attempt));
+                }
+            }
+            return unavailableFigure();
+        }
+    }
+});
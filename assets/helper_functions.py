@@ -1,8 +1,69 @@
+import functools
+
 import plotly.express as px
-import pandas as pd
+import plotly.graph_objects as go
 from dash import html, dcc
 from plotly.colors import sample_colorscale
 from assets.layouts import GRAPH_LAYOUT
+from assets.metrics import metrics
+
+# Colours of the four point scales, from the most negative to the most positive answer
+LIKERT_PALETTE = ["#e34a42", "#fcd177", "#98c792", "#32a35e"]
+
+# What each kind of chart adds to GRAPH_LAYOUT["general"], in plotly's update_layout syntax
+LAYOUT_UPDATES = {
+    "section_1_pie": dict(legend=dict(orientation="v", x=0.5, y=1, xanchor="center", yanchor="bottom"),
+                          piecolorway=px.colors.sequential.Blues_r),
+    "pie": dict(legend=GRAPH_LAYOUT["legend"]),
+    "yes_histogram": dict(
+        xaxis_title="User count",
+        yaxis_title="Services",
+        legend=dict(
+            title="Legend",
+            itemsizing="constant",  # Ensures the size remains constant
+            traceorder="normal",  # Keeps the order of traces
+            font=dict(size=12),
+            orientation="h",  # Horizontal legend
+            tracegroupgap=15 # Space between legend items
+        ),
+    ),
+    "cooccurrence_heatmap": dict(
+        height=800,
+        coloraxis=dict(colorscale="Blues", colorbar=dict(title="Users")),
+        xaxis=dict(tickangle=45, showgrid=False),
+        yaxis=dict(autorange="reversed", showgrid=False),  # First service on top, as in a table
+    ),
+    "likert_summary": dict(yaxis=dict(autorange="reversed")),  # Highest score on top
+}
+
+
+@functools.cache
+def base_layout(kind):
+    """Layout of one kind of chart, validated by plotly once and shared by every chart of that kind.
+
+    Charts are plain figure dicts built on it from their counts: going
+    through plotly express and update_layout for every chart copied and
+    validated the whole template again, which was most of a filtered render.
+    """
+    layout = go.Layout(**GRAPH_LAYOUT["general"])
+    layout.update(**LAYOUT_UPDATES[kind])
+    return layout.to_plotly_json()
+
+def merged(base, updates):
+    # Nested dicts of `updates` extend those of `base`, which stays untouched since it is shared
+    result = dict(base)
+    for key, value in updates.items():
+        result[key] = merged(base[key], value) if isinstance(value, dict) and isinstance(base.get(key), dict) else value
+    return result
+
+def chart_title(text):
+    return html.Div(
+        text,
+        style={
+            'textAlign': 'center', 'fontSize': '20px', 'color': '#1f2a44',
+            'fontFamily': 'Helvetica, Arial, sans-serif', 'fontWeight': 'normal', 'marginBottom': '2px'
+        }
+    )
 
 def clean_S3_question_title(question):
     # Define the part of the question to remove
@@ -46,236 +107,105 @@ def clean_S2_question_title(question):
     
     return cleaned_S2_question
 
-def Section_1_pie_chart(df, question):
-# Define colors: Red-Green for Yes/No, otherwise Sequential Blue
-
-    fig = px.pie(df, names=question, title=f"{question}", color_discrete_sequence=px.colors.sequential.Blues_r)
-    
-    fig.update_layout(title = None, legend=dict(
-        orientation="v",  # Vertical legend
-        x=0.5,           # Position it on the right
-        y=1,            # Center it vertically
-        xanchor="center",
-        yanchor="bottom"
-    ), **GRAPH_LAYOUT["general"])
-    # General layout updates
-    fig.update_traces(hovertemplate="%{label}: %{value}")
-    
-    title_html = html.Div(
-        f"{question}",
-        style={
-            'textAlign': 'center', 'fontSize': '20px', 'color': '#1f2a44',
-            'fontFamily': 'Helvetica, Arial, sans-serif', 'fontWeight': 'normal', 'marginBottom': '2px'
-        }
-    )
-    return html.Div([title_html, dcc.Graph(figure=fig)])
-
-def Interest_S3_pie_chart(df, question):
-    category_order = ["Not interested",
-                    "Somewhat Interested", 
-                    "Interested", 
-                    "Essential"]
-    color_mapping = {"Not interested": "#e34a42",
-                    "Somewhat Interested":"#fcd177", 
-                    "Interested":"#98c792", 
-                    "Essential":"#32a35e"}
-    
-    cleaned_question = clean_S3_question_title(question)
-
-    # Get value counts and convert to DataFrame
-    ord_values = df[question].value_counts().reset_index()
-    cat_c, v_c = ord_values.columns  
-
-    ord_values[cat_c] = pd.Categorical(ord_values[cat_c], categories=category_order, ordered=True)
-    ord_values = ord_values.sort_values(by=cat_c)
-    
-# Create the pie chart
-    fig = px.pie(
-        ord_values,  
-        names=cat_c,  # Use the column name directly
-        values=v_c,
-        color=cat_c,
-        color_discrete_map = color_mapping,
-        )
-    
-    fig.update_traces(hovertemplate="%{label}: %{value}",sort = False)
-    fig.update_layout(title=None, legend=GRAPH_LAYOUT["legend"], **GRAPH_LAYOUT["general"])
-    title_html = html.Div(
-        f"{cleaned_question}",
-        style={
-            'textAlign': 'center', 'fontSize': '20px', 'color': '#1f2a44',
-            'fontFamily': 'Helvetica, Arial, sans-serif', 'fontWeight': 'normal', 'marginBottom': '2px'
-        }
-    )
-    return html.Div([title_html, dcc.Graph(figure=fig)])
-
-def Interest_S4_pie_chart(df, question):
-    category_order = ["Not Interested",
-                    "Somewhat Interested", 
-                    "Interested", 
-                    "Essential"]
-    color_mapping = {"Not Interested": "#e34a42",
-                    "Somewhat Interested":"#fcd177", 
-                    "Interested":"#98c792", 
-                    "Essential":"#32a35e"}
-    
-    cleaned_S4_question = clean_S4_question_title(question)
-
-    # Get value counts and convert to DataFrame
-    ord_values = df[question].value_counts().reset_index()
-    cat_c, v_c = ord_values.columns  
-
-    ord_values[cat_c] = pd.Categorical(ord_values[cat_c], categories=category_order, ordered=True)
-    ord_values = ord_values.sort_values(by=cat_c)
-        
-    # Create the pie chart
-    fig = px.pie(
-        ord_values,  
-        names=cat_c,  # Use the column name directly
-        values=v_c,
-        color=cat_c,
-        color_discrete_map = color_mapping,
-        )
-    
-    fig.update_traces(hovertemplate="%{label}: %{value}",sort = False)
-    fig.update_layout(title=None, legend=GRAPH_LAYOUT["legend"], **GRAPH_LAYOUT["general"])
-    title_html = html.Div(
-        f"{cleaned_S4_question}",
-        style={
-            'textAlign': 'center', 'fontSize': '20px', 'color': '#1f2a44',
-            'fontFamily': 'Helvetica, Arial, sans-serif', 'fontWeight': 'normal', 'marginBottom': '2px'
-        }
-    )
-    return html.Div([title_html, dcc.Graph(figure=fig)])
-
-def create_pies(df, question, category_order, color_mapping):
-    # Handle missing values by replacing with "No Answer"
-    df_cleaned = df.copy()
-    df_cleaned[question] = df_cleaned[question].fillna("No Answer")
-    cleaned_S2_question = clean_S2_question_title(question)
-    
-    # Compute value counts
-    vc = df_cleaned[question].value_counts().reset_index()
-    category_column, value_column = vc.columns  
-
-    # Ensure "No Answer" is included in category_order if missing
-    if "No Answer" in vc[category_column].values and "No Answer" not in category_order:
-        category_order.append("No Answer")
-
-    # Convert to categorical and sort
-    vc[category_column] = pd.Categorical(vc[category_column], categories=category_order, ordered=True)
-    vc = vc.sort_values(by=category_column)
+def clean_question_title(question):
+    # Questions from any section, without their shared introduction
+    return clean_S2_question_title(clean_S42_question_title(clean_S4_question_title(clean_S3_question_title(question))))
+
+@metrics.timed("dashboard_chart_build_seconds", chart="Section_1_pie_chart")
+def Section_1_pie_chart(counts, question):
+    # Sequential blues, from the most frequent answer down
+    fig = {
+        "data": [{"type": "pie", "labels": counts.index.tolist(), "values": counts.tolist(),
+                  "hovertemplate": "%{label}: %{value}"}],
+        "layout": base_layout("section_1_pie"),
+    }
+    return html.Div([chart_title(f"{question}"), dcc.Graph(figure=fig)])
+
+@metrics.timed("dashboard_chart_build_seconds", chart="create_pies")
+def create_pies(counts, question, color_mapping, title_cleaner=clean_S2_question_title):
+    # Missing values are already counted as "No Answer" by the aggregate store
+    cleaned_question = title_cleaner(question) if title_cleaner else question
 
     # Ensure "No Answer" gets a color if not in the color mapping
     color_mapping = color_mapping.copy()  # Avoid modifying the original dictionary
     if "No Answer" not in color_mapping:
         color_mapping["No Answer"] = "#bbbbbb"  # Light gray for missing data
 
-    # Create the pie chart
-    fig = px.pie(
-        vc,
-        names=category_column,
-        values=value_column,
-        color=category_column,
-        color_discrete_map=color_mapping
-    )
-
-    # Update trace style
-    fig.update_traces(hovertemplate="%{label}: %{value}", sort=False)
-    fig.update_layout(title=None, legend=GRAPH_LAYOUT["legend"], **GRAPH_LAYOUT["general"])
-
-    # Create a title for the chart
-    title_html = html.Div(
-        f"{cleaned_S2_question}",
-        style={
-            'textAlign': 'center', 'fontSize': '20px', 'color': '#1f2a44',
-            'fontFamily': 'Helvetica, Arial, sans-serif', 'fontWeight': 'normal', 'marginBottom': '2px'
-        }
-    )
-
-    return html.Div([title_html, dcc.Graph(figure=fig)])
-
-def count_yes_responses(df, columns):
-    yes_counts = {df.columns[col]: (df.iloc[:, col] == "Yes").sum() for col in columns}
-    return pd.DataFrame({
-        "Column": list(yes_counts.keys()),
-        "Yes Count": list(yes_counts.values())
-    })
-
-def create_yes_histogram(df, extra_hist_cols):
+    # Answers outside the mapping take the default colours, in order
+    labels = counts.index.tolist()
+    fallback = px.colors.qualitative.Plotly
+    colors = [color_mapping.get(label, fallback[i % len(fallback)]) for i, label in enumerate(labels)]
+
+    # Create the pie chart, slices in the order of the answers
+    fig = {
+        "data": [{"type": "pie", "labels": labels, "values": counts.tolist(), "marker": {"colors": colors},
+                  "hovertemplate": "%{label}: %{value}", "sort": False}],
+        "layout": base_layout("pie"),
+    }
+    return html.Div([chart_title(f"{cleaned_question}"), dcc.Graph(figure=fig)])
+
+@metrics.timed("dashboard_chart_build_seconds", chart="create_yes_histogram")
+def create_yes_histogram(yes_counts_df):
     """Creates a single horizontal bar chart showing the 'Yes' counts per column with styling."""
-    # Count "Yes" responses for the specified columns
-    yes_counts_df = count_yes_responses(df, extra_hist_cols)
-    
-    # Create the bar chart
-    fig = px.bar(
-        yes_counts_df,
-        x="Yes Count",  # Use "Yes Count" as the x-axis
-        y="Column",  # Columns are used as the y-axis (questions)
-        orientation="h",  # Horizontal bars
-        text="Yes Count",
-    )
-
-    # Apply color scaling
-    fig.update_traces(
-        marker_color=sample_colorscale("RdYlGn", yes_counts_df["Yes Count"] / yes_counts_df["Yes Count"].max())
-    )
-
-    # Update layout with custom legend and other settings
-    fig.update_layout(
-        title=None,
-        xaxis_title="User count",
-        yaxis_title="Services",
-        legend=dict(
-            title="Legend",
-            itemsizing="constant",  # Ensures the size remains constant
-            traceorder="normal",  # Keeps the order of traces
-            font=dict(size=12),
-            orientation="h",  # Horizontal legend
-            tracegroupgap=15 # Space between legend items
-        ),
-        **GRAPH_LAYOUT["general"]  # Apply the general layout settings
-    )
+    yes_counts = yes_counts_df["Yes Count"]
+    fig = {
+        "data": [{
+            "type": "bar",
+            "orientation": "h",  # Horizontal bars, one per service
+            "x": yes_counts.tolist(),
+            "y": yes_counts_df["Column"].tolist(),
+            "text": yes_counts.tolist(),
+            "textposition": "auto",
+            # Red to green with the share of the most used service
+            "marker": {"color": sample_colorscale("RdYlGn", (yes_counts / (yes_counts.max() or 1)).tolist())},
+            "hovertemplate": "Yes Count=%{text}<br>Column=%{y}<extra></extra>",
+            "showlegend": False,
+        }],
+        "layout": base_layout("yes_histogram"),
+    }
+    return html.Div([chart_title("Number of service users per Blue-Cloud service"), dcc.Graph(figure=fig)])
+
+def shorten_label(label, max_length=45):
+    # Keeps both ends of long service names so similar ones stay distinguishable
+    if len(label) <= max_length:
+        return label
+    return f"{label[:max_length // 2]}…{label[-(max_length // 2):]}"
+
+@metrics.timed("dashboard_chart_build_seconds", chart="create_cooccurrence_heatmap")
+def create_cooccurrence_heatmap(cooccurrence_df):
+    """Heatmap of how many respondents use each pair of services together."""
+    labels = [shorten_label(label) for label in cooccurrence_df.columns]
+
+    fig = {
+        "data": [{"type": "heatmap", "x": labels, "y": labels, "z": cooccurrence_df.to_numpy().tolist(),
+                  "coloraxis": "coloraxis", "texttemplate": "%{z}",
+                  "hovertemplate": "%{y}<br>%{x}<br>Users of both: %{z}<extra></extra>"}],
+        "layout": base_layout("cooccurrence_heatmap"),
+    }
+    return html.Div([chart_title("Number of users per pair of Blue-Cloud services"), dcc.Graph(figure=fig)])
+
+@metrics.timed("dashboard_chart_build_seconds", chart="create_trend_chart")
+def create_trend_chart(trend_df, question, category_order):
+    """Stacked bars showing how the answers to one question moved between exports."""
+    color_mapping = dict(zip(category_order, LIKERT_PALETTE))
 
-    # Title for the graph
-    title_html = html.Div(
-        "Number of service users per Blue-Cloud service",
-        style={
-            'textAlign': 'center', 'fontSize': '20px', 'color': '#1f2a44',
-            'fontFamily': 'Helvetica, Arial, sans-serif', 'fontWeight': 'normal', 'marginBottom': '2px'
-        }
+    fig = px.bar(
+        trend_df,
+        x="Snapshot",
+        y="Share",
+        color="Answer",
+        custom_data=["Count"],
+        category_orders={"Answer": list(category_order)},
+        color_discrete_map=color_mapping,
     )
 
-    # Return the graph inside a div
-    return html.Div([title_html, dcc.Graph(figure=fig)])
-
-def Agreement_pie_chart(df, question, category_order):
-    # Get value counts and convert to DataFrame
-    ord_values = df[question].value_counts().reset_index()
-    cat_c, v_c = ord_values.columns  
+    fig.update_traces(hovertemplate="%{x}: %{customdata[0]} (%{y:.0f}%)")
+    fig.update_layout(title=None, barmode="stack", xaxis_title="Export", yaxis_title="Share of answers (%)",
+                      legend=GRAPH_LAYOUT["legend"], **GRAPH_LAYOUT["general"])
+    fig.update_yaxes(tickmode="auto", range=[0, 100])
 
-    ord_values[cat_c] = pd.Categorical(ord_values[cat_c], categories=category_order, ordered=True)
-    ord_values = ord_values.sort_values(by=cat_c)
-    
-    color_mapping = {"I fully disagree": "#e34a42",
-                    "I slightly disagree":"#fcd177", 
-                    "I slightly agree":"#98c792", 
-                    "I fully agree":"#32a35e"}
-    
-    cleaned_S42_question = clean_S42_question_title(question)
-# Create the pie chart
-    fig = px.pie(
-        ord_values,  
-        names=cat_c,  # Use the column name directly
-        values=v_c,
-        color=cat_c,
-        color_discrete_map = color_mapping,
-        )
-    
-    fig.update_traces(hovertemplate="%{label}: %{value}",sort = False)
-    fig.update_layout(title=None, legend=GRAPH_LAYOUT["legend"], **GRAPH_LAYOUT["general"])
     title_html = html.Div(
-        f"{cleaned_S42_question}",
+        f"{clean_question_title(question)}",
         style={
             'textAlign': 'center', 'fontSize': '20px', 'color': '#1f2a44',
             'fontFamily': 'Helvetica, Arial, sans-serif', 'fontWeight': 'normal', 'marginBottom': '2px'
@@ -283,22 +213,38 @@ def Agreement_pie_chart(df, question, category_order):
     )
     return html.Div([title_html, dcc.Graph(figure=fig)])
 
-def YesNo_pie_chart(df, question):
-    color_mapping = {"Yes": "#32a35e", "No": "#e34a42"}  # Green for Yes, Red for No
-    fig = px.pie(df, names=question, title=f"{question}", color=question, color_discrete_map=color_mapping)
-    
-    # Update trace style
-    fig.update_traces(hovertemplate="%{label}: %{value}", sort = False)
-    fig.update_layout(title=None, legend=GRAPH_LAYOUT["legend"], **GRAPH_LAYOUT["general"])
-    
-    # Create a title for the chart
-    title_html = html.Div(
-        f"{question}",
-        style={
-            'textAlign': 'center', 'fontSize': '20px', 'color': '#1f2a44',
-            'fontFamily': 'Helvetica, Arial, sans-serif', 'fontWeight': 'normal', 'marginBottom': '2px'
-        }
-    )
-    
-    return html.Div([title_html, dcc.Graph(figure=fig)])
-pass
\ No newline at end of file
+@metrics.timed("dashboard_chart_build_seconds", chart="create_likert_summary")
+def create_likert_summary(scores, order):
+    """Statements answered on one scale, ranked by mean score, with bootstrap intervals and top-2-box shares.
+
+    `order` is the scale's answers from the most negative to the most positive.
+    """
+    scale_size = len(order)
+    statements = [shorten_label(clean_question_title(question), 60) for question in scores["Question"]]
+    means = scores["Mean"]
+
+    fig = {
+        "data": [{
+            "type": "bar",
+            "orientation": "h",
+            "x": means.tolist(),
+            "y": statements,
+            "error_x": {"type": "data", "array": (scores["Mean high"] - means).tolist(),
+                        "arrayminus": (means - scores["Mean low"]).tolist()},
+            "customdata": scores[["Mean low", "Mean high", "Top-2 share", "Top-2 low", "Top-2 high",
+                                  "Answers"]].to_numpy().tolist(),
+            # Same colours as the answers: red for the most negative mean, green for the most positive
+            "marker": {"color": sample_colorscale(LIKERT_PALETTE, ((means - 1) / (scale_size - 1)).clip(0, 1).tolist())},
+            "hovertemplate": ("%{y}<br>Mean score: %{x:.2f} (%{customdata[0]:.2f}–%{customdata[1]:.2f})"
+                              "<br>Top-2 box: %{customdata[2]:.0f}% (%{customdata[3]:.0f}–%{customdata[4]:.0f}%)"
+                              "<br>Answers: %{customdata[5]}<extra></extra>"),
+            "showlegend": False,
+        }],
+        "layout": merged(base_layout("likert_summary"), {
+            "height": max(300, 40 * len(scores) + 120),
+            "xaxis": {"title": {"text": f"Mean score (1 = {order[0]}, {scale_size} = {order[-1]}), with 95% interval"},
+                      "range": [1, scale_size], "dtick": 1},
+        }),
+    }
+    return html.Div([chart_title(f"Statements ranked by mean score, from {order[0]} to {order[-1]}"),
+                     dcc.Graph(figure=fig)])
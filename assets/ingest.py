@@ -0,0 +1,82 @@
+import hashlib
+import hmac
+import os
+import time
+
+from flask import abort, jsonify, request
+
+from assets.survey_loader import parse_survey_csv, read_header
+
+MAX_BATCH_BYTES = 10 * 1024 * 1024  # Largest batch accepted by POST /ingest
+
+
+def pending_batches(drop_dir, dataset):
+    """Batch files of the drop directory that are not in `dataset` yet, oldest first.
+
+    Batches older than the export the dataset was built from are taken to
+    be part of that export.
+    """
+    if not drop_dir or not os.path.isdir(drop_dir):
+        return []
+    since = dataset.get("export_modified", dataset["modified"]).timestamp()
+    done = dataset.get("ingested", frozenset())
+    entries = [entry for entry in os.scandir(drop_dir)
+               if entry.name.endswith(".csv") and entry.name not in done and entry.stat().st_mtime > since]
+    entries.sort(key=lambda entry: (entry.stat().st_mtime, entry.name))
+    return [entry.path for entry in entries]
+
+def read_batch(path, header, columns, categorical_cols):
+    """Parses a batch of new answers, which must have the exact header of the loaded export."""
+    if read_header(path) != header:
+        raise ValueError("its columns differ from the loaded export")
+    df, _ = parse_survey_csv(path, columns, categorical_cols)
+    return df
+
+def batch_key(path):
+    # Identifies a batch in the dataset version
+    stat = os.stat(path)
+    return f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+def write_batch(drop_dir, body, header):
+    """Stores a posted batch in the drop directory, where every worker picks it up."""
+    os.makedirs(drop_dir, exist_ok=True)
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{hashlib.sha256(body).hexdigest()[:16]}.csv"
+    path = os.path.join(drop_dir, name)
+    # Written under another extension first so no poll picks up half a batch
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(body)
+    try:
+        if read_header(tmp_path) != header:
+            raise ValueError("The batch header does not match the loaded export")
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    return path
+
+def register_ingest_route(server, drop_dir, token, current_dataset, on_batch):
+    """POST /ingest with a CSV body (header line plus new rows) and an `Authorization: Bearer` token.
+
+    The batch is stored and queued: `on_batch` only asks for it to be
+    appended, so the route answers 202 without waiting for a rebuild. The
+    route answers 404 when no token is configured.
+    """
+
+    @server.route("/ingest", methods=["POST"])
+    def ingest():
+        if not token:
+            abort(404)
+        if not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+            abort(403)
+        if request.content_length is None or request.content_length > MAX_BATCH_BYTES:
+            abort(413)
+
+        try:
+            path = write_batch(drop_dir, request.get_data(), current_dataset()["header"])
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        on_batch()  # This worker appends it next, the others on their next poll
+        return jsonify({"batch": os.path.basename(path), "queued": True}), 202
+
+    return ingest
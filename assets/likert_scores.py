@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+BOOTSTRAP_RESAMPLES = 2000  # Fixed budget, whatever the number of respondents
+CONFIDENCE = 0.95
+
+
+def likert_counts(store, scales, mask=None):
+    """Answers per scale point of every question, one row per question of `scales`.
+
+    `scales` maps questions to their category order, from the most negative
+    to the most positive answer; answers outside it (blank, "No Answer",
+    unexpected text) are not scored. Rows of shorter scales end in zeros.
+    """
+    width = max((len(order) for order in scales.values()), default=0)
+    counts = np.zeros((len(scales), width), dtype=np.int64)
+    for i, (question, order) in enumerate(scales.items()):
+        labels, codes = store["codes"][question]
+        # Scale point of every label, 0 when it is off the scale; the extra last entry is for code -1
+        points = np.array([order.index(label) + 1 if label in order else 0 for label in labels] + [0])
+        scored = points[codes] if mask is None else points[codes[mask]]
+        counts[i, :len(order)] = np.bincount(scored, minlength=len(order) + 1)[1:]
+    return counts
+
+def bootstrap_scores(counts, scale_sizes, resamples=BOOTSTRAP_RESAMPLES, confidence=CONFIDENCE, seed=0):
+    """Mean score and top-2-box share of every question, with percentile bootstrap intervals.
+
+    Resampling a question's answers with replacement is a multinomial draw
+    from its answer shares, so every question and resample is drawn in one
+    call, at a cost independent of the number of respondents. The seed is
+    fixed so every reload and worker shows the same intervals.
+    """
+    n_questions, width = counts.shape
+    scale_sizes = np.asarray(scale_sizes)
+    answers = counts.sum(axis=1)
+    scores = np.arange(1, width + 1)
+    top_two = scores >= scale_sizes[:, None] - 1  # The two most positive points of each scale
+
+    shares = np.divide(counts, answers[:, None], out=np.full(counts.shape, 1 / max(width, 1)),
+                       where=answers[:, None] > 0)
+    rng = np.random.default_rng(seed)
+    samples = rng.multinomial(answers, shares, size=(resamples, n_questions))  # resamples x questions x points
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = (counts @ scores) / answers
+        top_two_shares = (counts * top_two).sum(axis=1) / answers
+        sample_means = (samples @ scores) / answers
+        sample_top_two = (samples * top_two).sum(axis=2) / answers
+    tails = [(1 - confidence) / 2 * 100, (1 + confidence) / 2 * 100]
+    mean_low, mean_high = np.percentile(sample_means, tails, axis=0)
+    top_two_low, top_two_high = np.percentile(sample_top_two, tails, axis=0)
+    return {
+        "Answers": answers,
+        "Mean": means,
+        "Mean low": mean_low,
+        "Mean high": mean_high,
+        "Top-2 share": top_two_shares * 100,
+        "Top-2 low": top_two_low * 100,
+        "Top-2 high": top_two_high * 100,
+    }
+
+def score_questions(store, scales, mask=None, **bootstrap_options):
+    """Scores of the questions of `scales`, ranked from the highest mean score down.
+
+    Questions nobody answered on the scale are left out.
+    """
+    counts = likert_counts(store, scales, mask)
+    scores = pd.DataFrame({"Question": list(scales),
+                           **bootstrap_scores(counts, [len(order) for order in scales.values()], **bootstrap_options)})
+    scores = scores[scores["Answers"] > 0]
+    return scores.sort_values(["Mean", "Top-2 share"], ascending=False, kind="stable").reset_index(drop=True)
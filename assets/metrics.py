@@ -0,0 +1,260 @@
+import bisect
+import functools
+import inspect
+import operator
+import os
+import threading
+import time
+import weakref
+
+from flask import Response, abort
+
+# Upper bounds in seconds, from a cached lookup to a cold word cloud
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+OTHER_LABEL = "other"  # Recorded instead of a label value that is not allowed
+
+METRIC_HELP = {
+    "dashboard_callback_seconds": "Duration of Dash callback invocations.",
+    "dashboard_chart_build_seconds": "Duration of chart builder calls.",
+    "dashboard_wordcloud_render_seconds": "Duration of uncached word cloud renders.",
+    "dashboard_dataset_reload_seconds": "Duration of dataset builds after the CSV changed.",
+    "dashboard_cache_requests_total": "Cache lookups by cache and result.",
+    "dashboard_startup_seconds": "Duration of the startup phases of this process.",
+}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+def _merge(into, samples):
+    # Adds samples up into others
+    histograms, counters = into
+    for key, values in samples[0].items():
+        total = histograms.setdefault(key, [0] * len(values))
+        for i, value in enumerate(values):
+            total[i] += value
+    for key, value in samples[1].items():
+        counters[key] = counters.get(key, 0) + value
+
+
+class Metrics:
+    """Latency histograms and counters, rendered in the Prometheus text format.
+
+    A series is a metric name with its labels, resolved once by `series`
+    so recording a sample is a lookup and an increment. Every thread
+    records into samples of its own, without locking; `render` adds them
+    up, and those of finished threads are merged into the retired ones.
+    When disabled, `timed` hands back the undecorated function and the
+    other methods return at once, so instrumented code runs as before.
+
+    Samples live in the process recording them: under gunicorn each worker
+    serves only its own at /metrics, and starts from zero when restarted.
+    """
+
+    def __init__(self, enabled=True, buckets=BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        # Samples are ({series: [count per bucket..., overflow, sum, count]}, {series: value})
+        self._local = threading.local()
+        self._live = {}  # id -> samples of a running thread
+        self._retired = ({}, {})
+        self._lock = threading.Lock()  # Guards _live and _retired, never taken to record
+
+    @staticmethod
+    def series(name, **labels):
+        return (name, tuple(sorted(labels.items())))
+
+    def _samples(self):
+        # Registers the samples of the calling thread, to be retired with it
+        samples = self._local.samples = ({}, {})
+        with self._lock:
+            self._live[id(samples)] = samples
+        weakref.finalize(threading.current_thread(), self._retire, samples)
+        return samples
+
+    def _retire(self, samples):
+        with self._lock:
+            del self._live[id(samples)]
+            _merge(self._retired, samples)
+
+    def observe(self, series, seconds):
+        if not self.enabled:
+            return
+        try:
+            values = self._local.samples[0][series]
+        except (AttributeError, KeyError):  # First sample of this thread or series
+            values = self._histogram(series)
+        values[bisect.bisect_left(self.buckets, seconds)] += 1  # Cumulated when rendered
+        values[-2] += seconds
+        values[-1] += 1
+
+    def _histogram(self, series):
+        try:
+            histograms = self._local.samples[0]
+        except AttributeError:
+            histograms = self._samples()[0]
+        return histograms.setdefault(series, [0] * (len(self.buckets) + 3))
+
+    def inc(self, series, amount=1):
+        if not self.enabled:
+            return
+        try:
+            counters = self._local.samples[1]
+        except AttributeError:
+            counters = self._samples()[1]
+        counters[series] = counters.get(series, 0) + amount
+
+    def timed(self, name, label_args=None, label_values=None, **labels):
+        """Decorator recording every call's duration in histogram `name`.
+
+        `labels` are fixed, `label_args` maps a label to the parameter whose
+        value it takes, e.g. {"section": "selected_section"}. Values coming
+        from clients have to be bounded by `label_values`, which maps such
+        a label to its allowed values; any other value is recorded as "other".
+        """
+        # The wrappers record like `observe` does, inlined as they run on every call
+        local, buckets = self._local, self.buckets
+        bisect_left, perf_counter = bisect.bisect_left, time.perf_counter
+
+        def decorate(func):
+            if not self.enabled:
+                return func
+            if not label_args:
+                series = self.series(name, **labels)
+
+                @functools.wraps(func)
+                def wrapper(*args, **kwargs):
+                    started = perf_counter()
+                    try:
+                        return func(*args, **kwargs)
+                    finally:
+                        elapsed = perf_counter() - started
+                        try:
+                            values = local.samples[0][series]
+                        except (AttributeError, KeyError):
+                            values = self._histogram(series)
+                        values[bisect_left(buckets, elapsed)] += 1
+                        values[-2] += elapsed
+                        values[-1] += 1
+                return wrapper
+
+            parameters = list(inspect.signature(func).parameters)
+            positions = [(parameters.index(arg), arg) for arg in label_args.values()]
+            # The label values of a positional call: one value for one label, a tuple for several
+            key_of = operator.itemgetter(*[i for i, _ in positions])
+            allowed = {label: frozenset(values) for label, values in (label_values or {}).items()}
+            series_by_key = {}  # Only allowed values end up in the keys, so it stays bounded
+            series_by_values = {}
+
+            def bounded(label, value):
+                try:
+                    return value if label not in allowed or value in allowed[label] else OTHER_LABEL
+                except TypeError:  # Unhashable, like a list sent by a client
+                    return OTHER_LABEL
+
+            def resolve(args, kwargs):
+                values = tuple(args[i] if i < len(args) else kwargs.get(arg) for i, arg in positions)
+                bounded_values = tuple(bounded(label, value) for label, value in zip(label_args, values))
+                series = series_by_values.get(bounded_values)
+                if series is None:
+                    series = series_by_values[bounded_values] = self.series(
+                        name, **labels, **dict(zip(label_args, bounded_values)))
+                if bounded_values == values and len(args) > positions[-1][0]:
+                    series_by_key[key_of(args)] = series
+                return series
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                started = perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    elapsed = perf_counter() - started
+                    # Label values passed by name, new or not allowed, and a thread's first sample take the slow path
+                    try:
+                        values = local.samples[0][series_by_key[key_of(args)]]
+                    except (AttributeError, IndexError, KeyError, TypeError):
+                        values = self._histogram(resolve(args, kwargs))
+                    values[bisect_left(buckets, elapsed)] += 1
+                    values[-2] += elapsed
+                    values[-1] += 1
+            return wrapper
+        return decorate
+
+    def snapshot(self):
+        """Every sample recorded so far, added up as ({series: histogram values}, {series: value})."""
+        histograms, counters = {}, {}
+        with self._lock:
+            for samples in [self._retired, *self._live.values()]:
+                # Copied first, as their thread may be recording meanwhile
+                _merge((histograms, counters), ({key: list(values) for key, values in dict(samples[0]).items()},
+                                                dict(samples[1])))
+        return histograms, counters
+
+    def samples_since(self, before):
+        """Samples recorded since the `before` snapshot, e.g. by a job process for its parent to `add`."""
+        histograms, counters = self.snapshot()
+        old_histograms, old_counters = before
+        for key, values in old_histograms.items():
+            histograms[key] = [value - old for value, old in zip(histograms[key], values)]
+        for key, value in old_counters.items():
+            counters[key] -= value
+        return ({key: values for key, values in histograms.items() if values[-1]},
+                {key: value for key, value in counters.items() if value})
+
+    def add(self, samples):
+        """Adds samples recorded in another process."""
+        with self._lock:
+            _merge(self._retired, samples)
+
+    def render(self):
+        histograms, counters = self.snapshot()
+
+        lines = []
+        described = set()
+        def describe(name, kind):
+            if name not in described:
+                described.add(name)
+                if name in METRIC_HELP:
+                    lines.append(f"# HELP {name} {METRIC_HELP[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), values in sorted(histograms.items()):
+            describe(name, "histogram")
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {values[-1]}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {values[-2]}")
+            lines.append(f"{name}_count{_format_labels(labels)} {values[-1]}")
+        for (name, labels), value in sorted(counters.items()):
+            describe(name, "counter")
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+# Shared by the whole app; set DASHBOARD_METRICS=1 to record and serve /metrics
+metrics = Metrics(enabled=os.environ.get("DASHBOARD_METRICS", "0") == "1")
+
+def register_metrics_route(server, metrics, path="/metrics", collect=None):
+    """Serves the metrics for Prometheus to scrape, 404 while they are disabled.
+
+    `collect`, when given, is called first, to `add` samples recorded elsewhere.
+    With several gunicorn workers, each scrape is answered by one of them
+    with its own samples only; nothing adds the workers up.
+    """
+
+    @server.route(path)
+    def serve_metrics():
+        if not metrics.enabled:
+            abort(404)
+        if collect is not None:
+            collect()
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+    return serve_metrics
@@ -0,0 +1,87 @@
+import functools
+import json
+
+from assets.helper_functions import (Section_1_pie_chart, create_pies, clean_S2_question_title,
+                                     clean_S3_question_title, clean_S4_question_title, clean_S42_question_title)
+
+# Chart types a question can have; word clouds and the services charts need
+# the whole dataset, so app.py draws them itself
+CHART_TYPES = {"respondent_pie", "pie", "wordcloud", "service"}
+TITLE_CLEANERS = {
+    "clean_S2_question_title": clean_S2_question_title,
+    "clean_S3_question_title": clean_S3_question_title,
+    "clean_S4_question_title": clean_S4_question_title,
+    "clean_S42_question_title": clean_S42_question_title,
+}
+
+
+def load_registry(path):
+    """Reads the question registry and resolves the named orders, palettes and title cleaners.
+
+    Returns the entries keyed by column position; any unknown name or
+    reused column raises a ValueError naming the question.
+    """
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+
+    entries = {}
+    for question, entry in config["questions"].items():
+        def fail(message):
+            raise ValueError(f"{path}: {message} for {question!r}")
+
+        if entry.get("chart") not in CHART_TYPES:
+            fail(f"unknown chart type {entry.get('chart')!r}")
+        for key, names in (("order", config["orders"]), ("palette", config["palettes"]), ("title", TITLE_CLEANERS)):
+            if key in entry and entry[key] not in names:
+                fail(f"unknown {key} {entry[key]!r}")
+        if entry["column"] in entries:
+            fail(f"column {entry['column']} used twice")
+
+        entries[entry["column"]] = {
+            "column": entry["column"],
+            "question": question,
+            "chart": entry["chart"],
+            "order": config["orders"].get(entry.get("order")),
+            "fill": entry.get("fill"),
+            "palette": config["palettes"].get(entry.get("palette"), {}),
+            "title_cleaner": TITLE_CLEANERS.get(entry.get("title")),
+            "trend": entry.get("trend", False),
+        }
+    return entries
+
+def columns_of(registry, chart):
+    return sorted(col for col, entry in registry.items() if entry["chart"] == chart)
+
+def check_columns(registry, columns):
+    """Every column the dashboard shows needs a registry entry."""
+    missing = sorted(set(columns) - set(registry))
+    if missing:
+        raise ValueError(f"No question registry entry for columns {missing}")
+
+def compile_dispatch(registry, header):
+    """Maps every registered question of `header` to its chart, failing on column drift.
+
+    A question whose header moved, was renamed or disappeared from the
+    export raises a ValueError listing all mismatches, instead of charting
+    another column's answers.
+    """
+    drift = []
+    for col, entry in sorted(registry.items()):
+        found = header[col] if col < len(header) else None
+        if found != entry["question"]:
+            drift.append(f"column {col}: expected {entry['question'][:60]!r}, found {(found or '')[:60]!r}")
+    if drift:
+        raise ValueError("The survey header does not match the question registry:\n" + "\n".join(drift))
+
+    dispatch = {}
+    for col, entry in registry.items():
+        spec = dict(entry)
+        if entry["chart"] == "respondent_pie":
+            spec["build"] = Section_1_pie_chart
+        elif entry["chart"] == "pie":
+            spec["build"] = functools.partial(create_pies, color_mapping=entry["palette"],
+                                              title_cleaner=entry["title_cleaner"])
+        else:
+            spec["build"] = None
+        dispatch[entry["question"]] = spec
+    return dispatch
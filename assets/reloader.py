@@ -0,0 +1,145 @@
+import datetime
+import hashlib
+import os
+import threading
+import time
+
+from assets.metrics import metrics
+
+RELOAD_SECONDS = metrics.series("dashboard_dataset_reload_seconds")
+
+
+def file_fingerprint(file_path):
+    """Returns the modification time and the SHA-256 of a file's content."""
+    mtime = os.path.getmtime(file_path)
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return mtime, digest.hexdigest()
+
+
+class DatasetReloader:
+    """Keeps the dataset built from a CSV file up to date without restarts.
+
+    A daemon thread polls the file's mtime. When it moves and the content
+    hash really changed, `build` runs in that thread and the result replaces
+    `current` in a single assignment, so callbacks never wait for a reload
+    and always see one complete dataset.
+
+    `extend`, when given, is called with the current dataset on every poll
+    and after every build; it returns a copy with newly arrived answers
+    appended, or None when there are none. `request_extend` wakes the
+    watcher for an early poll instead of waiting for the lock.
+
+    With `load_now` false the first build also runs in the watcher thread,
+    so startup does not wait for it; reading `current` blocks until it is
+    done, for at most `load_timeout` seconds. `on_load`, when given, is
+    called with the duration of that first load once it is served, and
+    `on_change` after the watcher replaced the dataset with a newer one.
+    """
+
+    def __init__(self, file_path, build, interval=30, extend=None, load_now=True, load_timeout=120,
+                 on_load=None, on_change=None):
+        self.file_path = file_path
+        self.build = build
+        self.interval = interval
+        self.extend = extend
+        self._mtime = None
+        self._version = None
+        self.load_timeout = load_timeout
+        self.on_load = on_load
+        self.on_change = on_change
+        self._lock = threading.Lock()  # Serializes rebuilds and appends
+        self._loaded = threading.Event()
+        self._wake = threading.Event()  # Set to poll before the interval is over
+        self._current = None
+        if load_now:
+            self.reload()  # The first load has to happen before serving
+
+    @property
+    def ready(self):
+        return self._loaded.is_set()
+
+    @property
+    def current(self):
+        if not self._loaded.wait(self.load_timeout):
+            raise RuntimeError(f"{self.file_path} is still being loaded")
+        return self._current
+
+    @current.setter
+    def current(self, dataset):
+        self._current = dataset
+        self._loaded.set()
+
+    def reload(self):
+        with self._lock:
+            mtime, version = file_fingerprint(self.file_path)
+            # Remembered before building so a broken export is retried only once it changes again
+            self._mtime = mtime
+            if version == self._version:
+                return False  # Touched but unchanged, nothing to rebuild
+
+            started = time.perf_counter()
+            dataset = self.build(self.file_path)
+            metrics.observe(RELOAD_SECONDS, time.perf_counter() - started)
+            dataset["version"] = version
+            dataset["modified"] = datetime.datetime.fromtimestamp(mtime)
+            self._version = version
+            first_load = not self.ready
+            self.current = self._extended(dataset)
+            if first_load and self.on_load is not None:
+                self.on_load(time.perf_counter() - started)
+            return True
+
+    def extend_current(self):
+        """Appends newly arrived answers to the current dataset, returns whether there were any."""
+        with self._lock:
+            extended = self._extended(self.current)
+            if extended is self.current:
+                return False
+            self.current = extended
+            return True
+
+    def request_extend(self):
+        """Has the watcher thread append newly arrived answers soon, without waiting for it."""
+        self._wake.set()
+
+    def _extended(self, dataset):
+        if self.extend is None:
+            return dataset
+        extended = self.extend(dataset)
+        return dataset if extended is None else extended
+
+    def start(self):
+        thread = threading.Thread(target=self._watch, name="csv-reloader", daemon=True)
+        thread.start()
+        return thread
+
+    def _watch(self):
+        while not self.ready:
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"Loading {self.file_path} failed: {e}")
+                time.sleep(self.interval)
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()  # Batches arriving from here on are picked up by the next poll
+            changed = False
+            try:
+                if os.path.getmtime(self.file_path) != self._mtime:
+                    if self.reload():
+                        changed = True
+                        print(f"Reloaded {self.file_path} ({self.current['version'][:12]})")
+            except Exception as e:
+                # Keep serving the last good dataset, e.g. while an export is still being written
+                print(f"Reload of {self.file_path} failed: {e}")
+            try:
+                if self.extend_current():
+                    changed = True
+                    print(f"Appended new answers ({self.current['respondent_count']} respondents)")
+            except Exception as e:
+                print(f"Appending new answers failed: {e}")
+            if changed and self.on_change is not None:
+                self.on_change()
@@ -0,0 +1,35 @@
+import time
+
+import psutil
+
+from assets.metrics import metrics
+
+# Phases of this process's startup in order, with their duration in seconds
+_phases = []
+_last_mark = None
+
+
+def mark(phase):
+    """Ends `phase` now; the first phase starts with the process, so it includes the interpreter's own startup."""
+    global _last_mark
+    now = time.perf_counter()
+    if _last_mark is None:
+        seconds = time.time() - psutil.Process().create_time()
+    else:
+        seconds = now - _last_mark
+    _last_mark = now
+    record(phase, seconds)
+
+def record(phase, seconds):
+    """Adds a phase timed elsewhere, e.g. a data load running in the background."""
+    _phases.append((phase, seconds))
+    metrics.observe(metrics.series("dashboard_startup_seconds", phase=phase), seconds)
+
+def phases():
+    return list(_phases)
+
+def startup_report():
+    width = max((len(phase) for phase, _ in _phases), default=0)
+    lines = [f"{phase:<{width}}  {seconds:7.3f}s" for phase, seconds in _phases]
+    lines.append(f"{'total':<{width}}  {sum(seconds for _, seconds in _phases):7.3f}s")
+    return "\n".join(lines)
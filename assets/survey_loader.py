@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from assets.metrics import metrics
+
+CSV_OPTIONS = {"sep": ";", "encoding": "utf-8"}
+SNAPSHOT_METADATA_KEY = b"survey_snapshot"
+SNAPSHOT_HIT = metrics.series("dashboard_cache_requests_total", cache="snapshot", result="hit")
+SNAPSHOT_MISS = metrics.series("dashboard_cache_requests_total", cache="snapshot", result="miss")
+
+
+def snapshot_path_for(file_path):
+    """The snapshot lives next to the CSV it was built from."""
+    return os.path.splitext(file_path)[0] + ".feather"
+
+def read_header(file_path):
+    # Same column name mangling as a full read, without parsing any row
+    return list(pd.read_csv(file_path, nrows=0, **CSV_OPTIONS).columns)
+
+def _layout_key(columns, categorical_cols):
+    # A snapshot is only reused for the same columns and category orders
+    layout = {"columns": columns, "categories": {str(col): order for col, order in categorical_cols.items()}}
+    return hashlib.sha256(json.dumps(layout, sort_keys=True).encode("utf-8")).hexdigest()
+
+def to_categorical(series, category_order=None):
+    """Converts answers to a category dtype, keeping unexpected answers as extra categories."""
+    observed = series.dropna().unique().tolist()
+    if category_order is None:
+        return series.astype(pd.CategoricalDtype(sorted(observed)))
+    categories = list(category_order) + sorted(set(observed) - set(category_order))
+    return series.astype(pd.CategoricalDtype(categories, ordered=True))
+
+def _with_categories(df, header, categorical_cols):
+    for col, order in categorical_cols.items():
+        df[header[col]] = to_categorical(df[header[col]], order)
+    return df
+
+def parse_survey_csv(file_path, columns, categorical_cols):
+    """Reads only the used columns of the CSV, Likert and Yes/No answers as categories."""
+    header = read_header(file_path)
+    names = [header[col] for col in columns]
+    df = pd.read_csv(file_path, usecols=names, **CSV_OPTIONS)[names]
+    return _with_categories(df, header, categorical_cols), header
+
+def iter_survey_chunks(file_path, columns, categorical_cols, chunk_rows):
+    """Reads the used columns of the CSV `chunk_rows` rows at a time, parsed like parse_survey_csv.
+
+    The categories of each chunk are the order plus the answers seen in
+    that chunk. Every column is read as text, so a chunk where a column is
+    blank throughout does not turn it into floats.
+    """
+    header = read_header(file_path)
+    names = [header[col] for col in columns]
+    with pd.read_csv(file_path, usecols=names, chunksize=chunk_rows, dtype=str, **CSV_OPTIONS) as reader:
+        for df in reader:
+            yield _with_categories(df[names], header, categorical_cols)
+
+def write_snapshot(df, header, snapshot_path, source_stat, layout_key):
+    metadata = {
+        "header": header,
+        "source_mtime_ns": source_stat.st_mtime_ns,
+        "source_size": source_stat.st_size,
+        "layout_key": layout_key,
+    }
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, SNAPSHOT_METADATA_KEY: json.dumps(metadata)})
+
+    # Uncompressed so the columns can be memory-mapped; renamed into place so
+    # a concurrent reader never sees a partial file
+    tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, snapshot_path)
+
+def read_snapshot(snapshot_path, source_stat, layout_key):
+    """Returns (df, header) from a snapshot, or None when it is missing or stale."""
+    try:
+        table = feather.read_table(snapshot_path, memory_map=True)
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+    metadata = json.loads((table.schema.metadata or {}).get(SNAPSHOT_METADATA_KEY, b"{}"))
+    if (metadata.get("source_mtime_ns") != source_stat.st_mtime_ns
+            or metadata.get("source_size") != source_stat.st_size
+            or metadata.get("layout_key") != layout_key):
+        return None
+    return table.to_pandas(), metadata["header"]
+
+def load_survey(file_path, columns, categorical_cols):
+    """Loads the survey through its binary snapshot, rebuilding it when the CSV changed.
+
+    Only `columns` (positions in the CSV header) are kept, so unused and
+    personal columns such as names and emails never reach memory. Returns
+    the dataframe and the full CSV header to map positions to names.
+    """
+    source_stat = os.stat(file_path)
+    snapshot_path = snapshot_path_for(file_path)
+    layout_key = _layout_key(columns, categorical_cols)
+
+    snapshot = read_snapshot(snapshot_path, source_stat, layout_key)
+    if snapshot is not None:
+        metrics.inc(SNAPSHOT_HIT)
+        return snapshot
+    metrics.inc(SNAPSHOT_MISS)
+
+    df, header = parse_survey_csv(file_path, columns, categorical_cols)
+    try:
+        write_snapshot(df, header, snapshot_path, source_stat, layout_key)
+    except OSError as e:
+        print(f"Could not write snapshot {snapshot_path}: {e}")  # Still usable from the CSV
+    return df, header
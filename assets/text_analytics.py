@@ -0,0 +1,141 @@
+import importlib.util
+import os
+import re
+from collections import Counter
+
+import numpy as np
+
+from assets.aggregates import RowBuffer
+
+# Same word pattern as WordCloud: words of two or more characters
+TOKEN_PATTERN = re.compile(r"\w[\w']+")
+
+
+def wordcloud_stopwords():
+    """The stopword list shipped with wordcloud, read without importing it (and matplotlib with it)."""
+    package_dir = importlib.util.find_spec("wordcloud").submodule_search_locations[0]
+    with open(os.path.join(package_dir, "stopwords")) as f:
+        return set(map(str.strip, f.readlines()))
+
+def tokenize(text, stopwords):
+    """Lowercased words of one answer, without stopwords, numbers and trailing 's."""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text):
+        if token.lower().endswith("'s"):
+            token = token[:-2]
+        if token and not token.isdigit() and token.lower() not in stopwords:
+            tokens.append(token)
+    return tokens
+
+def _sparse_counts(row_ids, term_ids, n_terms, row_offset=0):
+    # One (response, term, count) triple per distinct term of a response
+    keys = np.asarray(row_ids, dtype=np.int64) * max(n_terms, 1) + np.asarray(term_ids, dtype=np.int64)
+    keys, counts = np.unique(keys, return_counts=True)
+    return {
+        "row_ids": (keys // max(n_terms, 1) + row_offset).astype(np.int32),
+        "term_ids": (keys % max(n_terms, 1)).astype(np.int32),
+        "counts": counts.astype(np.int32),
+    }
+
+def build_term_index(series, stopwords):
+    """Tokenizes every answer of a free-text column once and keeps per-answer term counts.
+
+    Terms are counted case-insensitively and shown in their most frequent
+    spelling. Bigrams are pairs of consecutive words once stopwords are
+    removed.
+    """
+    empty = {"row_ids": np.empty(0, np.int32), "term_ids": np.empty(0, np.int32), "counts": np.empty(0, np.int32)}
+    index = {
+        "stopwords": {word.lower() for word in stopwords},
+        "row_count": 0,
+        # Vocabulary, only ever extended in place: older indexes sharing it keep valid ids and show the latest spellings
+        "term_ids": {},
+        "bigram_ids": {},
+        "spellings": [],
+        "terms": [],
+        "bigrams": [],
+        "term_counts": empty,
+        "bigram_counts": empty,
+        "buffers": {"term_counts": {}, "bigram_counts": {}},
+    }
+    return append_term_index(index, series)
+
+def _append_sparse(buffers, old, new):
+    # Earlier indexes keep their own, shorter views of the same buffers
+    for key, array in old.items():
+        if key not in buffers:
+            buffers[key] = RowBuffer(array)
+    return {key: buffers[key].append(new[key]) for key in old}
+
+def append_term_index(index, series):
+    """A new index with the answers of `series` added after the indexed ones."""
+    term_ids, bigram_ids, spellings = index["term_ids"], index["bigram_ids"], index["spellings"]
+    rows, terms, bigram_rows, bigrams = [], [], [], []
+    touched, new_bigrams = set(), []
+
+    for row, text in enumerate(series):
+        if not isinstance(text, str):
+            continue
+        words = []
+        for token in tokenize(text, index["stopwords"]):
+            word = token.lower()
+            if word not in term_ids:
+                term_ids[word] = len(term_ids)
+                spellings.append(Counter())
+            term = term_ids[word]
+            spellings[term][token] += 1
+            touched.add(term)
+            rows.append(row)
+            terms.append(term)
+            words.append(word)
+        for pair in zip(words, words[1:]):
+            if pair not in bigram_ids:
+                bigram_ids[pair] = len(bigram_ids)
+                new_bigrams.append(pair)
+            bigram_rows.append(row)
+            bigrams.append(bigram_ids[pair])
+
+    # Grown in place, not copied; only the spellings of terms used again can change
+    shown = index["terms"]
+    shown.extend([None] * (len(term_ids) - len(shown)))
+    for term in touched:
+        shown[term] = spellings[term].most_common(1)[0][0]
+    index["bigrams"].extend(new_bigrams)
+
+    offset = index["row_count"]
+    buffers = index["buffers"]
+    return {
+        **index,
+        "row_count": offset + len(series),
+        "term_counts": _append_sparse(buffers["term_counts"], index["term_counts"],
+                                      _sparse_counts(rows, terms, len(term_ids), offset)),
+        "bigram_counts": _append_sparse(buffers["bigram_counts"], index["bigram_counts"],
+                                        _sparse_counts(bigram_rows, bigrams, len(bigram_ids), offset)),
+    }
+
+def _sum_counts(sparse, n_terms, mask):
+    if mask is None:
+        return np.bincount(sparse["term_ids"], weights=sparse["counts"], minlength=n_terms)
+    selected = mask[sparse["row_ids"]]
+    return np.bincount(sparse["term_ids"][selected], weights=sparse["counts"][selected], minlength=n_terms)
+
+def term_frequencies(index, mask=None):
+    """Summed term counts of the answers in `mask` (all answers by default), plurals merged."""
+    totals = _sum_counts(index["term_counts"], len(index["terms"]), mask)
+    frequencies = {index["terms"][i]: int(totals[i]) for i in np.flatnonzero(totals)}
+
+    # Like WordCloud, "services" is counted as "service" when both are used
+    lower = {term.lower(): term for term in frequencies}
+    for term in list(frequencies):
+        word = term.lower()
+        if word.endswith("s") and not word.endswith("ss") and word[:-1] in lower:
+            frequencies[lower[word[:-1]]] += frequencies.pop(term)
+    return frequencies
+
+def top_bigrams(index, mask=None, limit=10):
+    totals = _sum_counts(index["bigram_counts"], len(index["bigrams"]), mask)
+    top = np.argsort(-totals, kind="stable")[:limit]
+    return [(" ".join(index["bigrams"][i]), int(totals[i])) for i in top if totals[i] > 0]
+
+def top_terms(frequencies, limit=10):
+    return Counter(frequencies).most_common(limit)
@@ -0,0 +1,121 @@
+import datetime
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from assets.survey_loader import load_survey, read_header, iter_survey_chunks
+
+
+def snapshot_date(file_path):
+    """Reads the export date from names like ..._24062025.csv or ...270325.csv."""
+    match = re.search(r"(\d{6}|\d{8})(?=\.csv$)", os.path.basename(file_path))
+    if match:
+        digits = match.group(1)
+        date_format = "%d%m%y" if len(digits) == 6 else "%d%m%Y"
+        try:
+            return datetime.datetime.strptime(digits, date_format)
+        except ValueError:
+            pass
+    # The live export carries no date in its name
+    return datetime.datetime.fromtimestamp(os.path.getmtime(file_path))
+
+def category_distributions(df, header, likert_cols):
+    """Counts every Likert column of one export in a single pass over its category codes."""
+    distributions = {}
+    for col in likert_cols:
+        series = df[header[col]]
+        codes = series.cat.codes.to_numpy()
+        counts = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories))
+        distributions[col] = pd.Series(counts, index=list(series.cat.categories))
+    return distributions
+
+def add_distributions(totals, distributions, categorical_cols):
+    """Adds the distributions of one chunk, in the category order of a whole-file read."""
+    for col, counts in distributions.items():
+        if col in totals:
+            order = list(categorical_cols[col] or [])
+            counts = totals[col].add(counts, fill_value=0).astype(np.int64)
+            counts = counts.reindex(order + sorted(set(counts.index) - set(order)))
+        totals[col] = counts
+    return totals
+
+
+class TrendEngine:
+    """Per-export category distributions for the survey history.
+
+    Each export is loaded once and its distributions are cached under the
+    file's size and mtime, so refreshing with a new export only processes
+    that file. Uncached exports are loaded in parallel. With `chunk_rows`,
+    exports are streamed that many rows at a time and only the Likert
+    columns are read.
+    """
+
+    def __init__(self, columns, categorical_cols, likert_cols, max_workers=4, chunk_rows=0):
+        self.columns = columns
+        self.categorical_cols = categorical_cols
+        self.likert_cols = likert_cols
+        self.max_workers = max_workers
+        self.chunk_rows = chunk_rows
+        self._snapshots = {}
+        self._lock = threading.Lock()
+
+    def _load(self, file_path):
+        if self.chunk_rows:
+            respondents, distributions = self._count_in_chunks(file_path)
+        else:
+            df, header = load_survey(file_path, self.columns, self.categorical_cols)
+            respondents, distributions = df.shape[0], category_distributions(df, header, self.likert_cols)
+        return {
+            "path": file_path,
+            "date": snapshot_date(file_path),
+            "respondents": respondents,
+            "distributions": distributions,
+        }
+
+    def _count_in_chunks(self, file_path):
+        header = read_header(file_path)
+        categorical_cols = {col: self.categorical_cols[col] for col in self.likert_cols}
+        respondents, distributions = 0, {}
+        for df in iter_survey_chunks(file_path, self.likert_cols, categorical_cols, self.chunk_rows):
+            respondents += df.shape[0]
+            add_distributions(distributions, category_distributions(df, header, self.likert_cols), categorical_cols)
+        return respondents, distributions
+
+    def refresh(self, file_paths):
+        """Returns the snapshots of `file_paths` ordered by date, loading only new or changed files."""
+        keys = {}
+        for file_path in file_paths:
+            stat = os.stat(file_path)
+            keys[file_path] = (file_path, stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            missing = [file_path for file_path, key in keys.items() if key not in self._snapshots]
+            if missing:
+                with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                    for file_path, snapshot in zip(missing, pool.map(self._load, missing)):
+                        self._snapshots[keys[file_path]] = snapshot
+            # Forget versions of files that changed since they were cached
+            self._snapshots = {key: snapshot for key, snapshot in self._snapshots.items()
+                               if key in keys.values()}
+            snapshots = list(self._snapshots.values())
+
+        return sorted(snapshots, key=lambda snapshot: snapshot["date"])
+
+def trend_frame(snapshots, col):
+    """Long-format counts and shares of one question across the snapshots."""
+    rows = []
+    for snapshot in snapshots:
+        counts = snapshot["distributions"][col]
+        total = counts.sum()
+        for category, count in counts.items():
+            rows.append({
+                "Snapshot": snapshot["date"].strftime("%d-%m-%Y"),
+                "Answer": category,
+                "Count": int(count),
+                "Share": count / total * 100 if total else 0.0,
+            })
+    return pd.DataFrame(rows, columns=["Snapshot", "Answer", "Count", "Share"])
@@ -0,0 +1,30 @@
+import hashlib
+import json
+
+from assets.disk_lru import DiskLRU, register_cache_route
+
+
+def make_wordcloud_key(frequencies, render_params):
+    """Hashes everything that changes the rendered image into a cache key."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(sorted(frequencies.items())).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(json.dumps(render_params, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class WordCloudCache(DiskLRU):
+    """Bounded LRU cache of rendered word cloud PNGs.
+
+    Entries live in memory and, when a cache directory is given, also on disk
+    so the images survive a restart. Both levels evict the least recently
+    used image once they are full.
+    """
+
+    def __init__(self, max_entries=64, cache_dir=None, max_disk_entries=512, url_prefix="/wordclouds/"):
+        super().__init__("wordcloud", ".png", url_prefix, max_entries, cache_dir, max_disk_entries)
+
+def register_wordcloud_route(server, cache):
+    """Serves cached word clouds by key with an ETag and long-lived cache headers."""
+    # Keys are SHA-256 digests
+    return register_cache_route(server, cache, r"[0-9a-f]{64}", "image/png", "serve_wordcloud")
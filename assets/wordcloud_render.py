@@ -0,0 +1,37 @@
+import functools
+import io
+
+import numpy as np
+
+from assets.metrics import metrics
+
+
+@functools.cache
+def _wordcloud_machinery():
+    # wordcloud brings matplotlib along, so both are only imported by the first render
+    from matplotlib import colormaps
+    from wordcloud import WordCloud
+    # Same colours as the wordcloud default, looked up without going through pyplot
+    return WordCloud, colormaps["viridis"]
+
+def viridis_color_func(word, font_size, position, orientation, random_state=None, **kwargs):
+    _, viridis = _wordcloud_machinery()
+    r, g, b, _ = np.maximum(0, 255 * np.array(viridis(random_state.uniform(0, 1))))
+    return f"rgb({r:.0f}, {g:.0f}, {b:.0f})"
+
+@metrics.timed("dashboard_wordcloud_render_seconds")
+def render_wordcloud_png(frequencies, params):
+    """Renders a word cloud straight to compressed PNG bytes.
+
+    Nothing goes through matplotlib figures, so no state is left behind
+    and memory only depends on the image size. Every call works on its
+    own WordCloud, so clouds can be rendered from several threads.
+    `frequencies` are already tokenized term counts, see text_analytics.
+    """
+    WordCloud, _ = _wordcloud_machinery()
+    wordcloud = WordCloud(color_func=viridis_color_func, **params).generate_from_frequencies(frequencies)
+    image = wordcloud.to_image()
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    image.close()
+    return buffer.getvalue()
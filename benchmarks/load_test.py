@@ -0,0 +1,265 @@
+"""Replays tab-switch sessions against the section callback at a given concurrency.
+
+Starts the dashboard under gunicorn (gunicorn.conf.py) on a local port,
+or targets a running one with --url, then has --users simulated
+stakeholders open the page and switch tabs, sometimes filtering by a
+professional group. Every user keeps the rendered-sections store the way
+a browser does, so revisited tabs cost what they cost in production.
+Reports throughput and p50/p95/p99 latency per section with error rates;
+exits with status 1 when the overall p95 exceeds --max-p95.
+
+Only /_dash-update-component calls of update_graphs_by_section are
+replayed; the figure, word cloud and background job requests the
+browser makes next are not.
+
+    python -m benchmarks.load_test --users 20 --duration 60 --workers 2
+"""
+import argparse
+import gzip
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+
+import brotli
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CALLBACK_PATH = "/_dash-update-component"
+PERCENTILES = [50, 95, 99]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_server(port, workers, threads, timeout=180):
+    """Runs gunicorn with the repository's settings and waits until it answers."""
+    env = {**os.environ, "GUNICORN_BIND": f"127.0.0.1:{port}", "GUNICORN_WORKERS": str(workers),
+           "GUNICORN_THREADS": str(threads)}
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:server"],
+                              cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {server.returncode}")
+        try:
+            get_json(f"http://127.0.0.1:{port}", "/_dash-dependencies")
+            return server
+        except OSError:
+            time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError(f"The dashboard did not answer within {timeout}s")
+
+def connect(base_url):
+    url = urllib.parse.urlsplit(base_url)
+    connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+    return connection_class(url.netloc, timeout=60), url.path.rstrip("/")
+
+def get_json(base_url, path):
+    connection, prefix = connect(base_url)
+    try:
+        connection.request("GET", prefix + path)
+        response = connection.getresponse()
+        if response.status != 200:
+            raise OSError(f"GET {path} answered {response.status}")
+        return json.loads(response.read())
+    finally:
+        connection.close()
+
+def find_component(component, component_id):
+    """Props of the component with `component_id` in a serialized Dash layout."""
+    if isinstance(component, list):
+        children = component
+    elif isinstance(component, dict) and "props" in component:
+        if component["props"].get("id") == component_id:
+            return component["props"]
+        children = component["props"].get("children")
+        children = children if isinstance(children, list) else [children]
+    else:
+        return None
+    for child in children:
+        props = find_component(child, component_id)
+        if props is not None:
+            return props
+    return None
+
+def section_callback(base_url):
+    """Request template of update_graphs_by_section, with the tabs, dataset and group filter choices of the page."""
+    dependencies = get_json(base_url, "/_dash-dependencies")
+    callback = next(dependency for dependency in dependencies
+                    if dependency["inputs"][:1] == [{"id": "tabs", "property": "value"}])
+    layout = get_json(base_url, "/_dash-layout")
+    tabs = [tab["props"]["value"] for tab in find_component(layout, "tabs")["children"]]
+    groups = [option["value"] if isinstance(option, dict) else option
+              for option in find_component(layout, "filter-group")["options"]]
+    outputs = [dict(zip(("id", "property"), output.rsplit(".", 1)))
+               for output in callback["output"].strip(".").split("...")]
+    return {"callback": callback, "outputs": outputs, "tabs": tabs, "groups": groups,
+            "dataset": find_component(layout, "dataset-select")["value"]}
+
+def callback_body(template, values, changed, rendered_sections):
+    callback = template["callback"]
+    return {
+        "output": callback["output"],
+        "outputs": template["outputs"],
+        "inputs": [{**dependency, "value": values.get(dependency["id"])} for dependency in callback["inputs"]],
+        "changedPropIds": [f"{changed}.value"],
+        "state": [{**dependency, "value": rendered_sections} for dependency in callback["state"]],
+    }
+
+class Session:
+    """One stakeholder: opens the page, switches tabs and sometimes filters, thinking in between."""
+
+    def __init__(self, base_url, template, rng, visits, filter_share, think_seconds, record):
+        self.connection, self.prefix = connect(base_url)
+        self.template = template
+        self.rng = rng
+        self.visits = visits
+        self.filter_share = filter_share
+        self.think_seconds = think_seconds
+        self.record = record
+
+    def run(self, stop_at):
+        values = {"tabs": self.template["tabs"][0], "dataset-select": self.template["dataset"]}
+        rendered_sections = {}
+        # The page load renders the first tab, then each step switches tab or filter
+        steps = [("tabs", None)] + [("filter-group", None) if self.rng.random() < self.filter_share
+                                    else ("tabs", self.rng.choice(self.template["tabs"]))
+                                    for _ in range(self.visits)]
+        for changed, tab in steps:
+            if time.monotonic() >= stop_at:
+                break
+            if tab is not None:
+                values["tabs"] = tab
+            elif changed == "filter-group" and self.template["groups"]:
+                values["filter-group"] = [self.rng.choice(self.template["groups"])]
+            rendered_sections = self.call(values, changed, rendered_sections)
+            if self.think_seconds:
+                time.sleep(self.rng.expovariate(1 / self.think_seconds))
+        self.connection.close()
+
+    def call(self, values, changed, rendered_sections):
+        body = json.dumps(callback_body(self.template, values, changed, rendered_sections))
+        started = time.perf_counter()
+        try:
+            self.connection.request("POST", self.prefix + CALLBACK_PATH, body=body,
+                                    headers={"Content-Type": "application/json", "Accept-Encoding": "br, gzip"})
+            response = self.connection.getresponse()
+            payload = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException) as e:
+            self.connection.close()  # Reconnects on the next request
+            self.record(values["tabs"], time.perf_counter() - started, type(e).__name__)
+            return rendered_sections
+        self.record(values["tabs"], time.perf_counter() - started, None if status in (200, 204) else str(status))
+        if status != 200:
+            return rendered_sections  # 204 when the browser already holds the section
+        # Decoded like a browser would, outside the measured latency
+        encoding = response.getheader("Content-Encoding")
+        payload = brotli.decompress(payload) if encoding == "br" else gzip.decompress(payload) if encoding == "gzip" else payload
+        store = json.loads(payload)["response"].get("rendered-sections")
+        return rendered_sections if store is None else store["data"]
+
+def run_load(base_url, users, duration, visits, filter_share, think_seconds, seed=0):
+    """Latencies and errors of every callback request, by section, over `duration` seconds."""
+    template = section_callback(base_url)
+    results = {}
+    lock = threading.Lock()
+
+    def record(section, seconds, error):
+        with lock:
+            results.setdefault(section, []).append((seconds, error))
+
+    stop_at = time.monotonic() + duration
+
+    def user(index):
+        rng = random.Random(seed * 1000 + index)
+        while time.monotonic() < stop_at:
+            Session(base_url, template, rng, visits, filter_share, think_seconds, record).run(stop_at)
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=user, args=(i,), daemon=True) for i in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.monotonic() - started
+
+def summarize(results, elapsed):
+    def stats(samples):
+        latencies = np.array([seconds for seconds, _ in samples])
+        errors = sum(error is not None for _, error in samples)
+        row = {"requests": len(samples), "throughput": len(samples) / elapsed,
+               "error_rate": errors / len(samples) if samples else 0.0}
+        row.update({f"p{p}": float(np.percentile(latencies, p)) if len(latencies) else None for p in PERCENTILES})
+        return row
+
+    every = [sample for samples in results.values() for sample in samples]
+    errors = {}
+    for _, error in every:
+        if error is not None:
+            errors[error] = errors.get(error, 0) + 1
+    return {"elapsed": elapsed, "total": stats(every), "errors": errors,
+            "sections": {section: stats(samples) for section, samples in sorted(results.items())}}
+
+def report(summary):
+    width = max([len(section) for section in summary["sections"]] + [len("all sections")])
+    lines = [f"{'section':<{width}}  {'requests':>8}  {'req/s':>7}  {'errors':>7}"
+             + "".join(f"  {f'p{p}':>8}" for p in PERCENTILES)]
+    for section, row in list(summary["sections"].items()) + [("all sections", summary["total"])]:
+        lines.append(f"{section:<{width}}  {row['requests']:>8}  {row['throughput']:>7.1f}  {row['error_rate']:>6.1%}"
+                     + "".join(f"  {row[f'p{p}'] * 1000:>6.0f}ms" if row[f"p{p}"] is not None else f"  {'-':>8}"
+                               for p in PERCENTILES))
+    lines += [f"{error}: {count}" for error, count in sorted(summary["errors"].items())]
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="Running dashboard to target instead of starting one")
+    parser.add_argument("--workers", type=int, default=1, help="Gunicorn workers of the started dashboard")
+    parser.add_argument("--threads", type=int, default=4, help="Threads per gunicorn worker")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent simulated stakeholders")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of load")
+    parser.add_argument("--visits", type=int, default=8, help="Tab switches per session")
+    parser.add_argument("--filter-share", type=float, default=0.2, help="Share of steps that change the filter")
+    parser.add_argument("--think", type=float, default=1.0, help="Mean pause between a user's steps, in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the sessions")
+    parser.add_argument("--output", default=None, help="JSON file of the results")
+    parser.add_argument("--max-p95", type=float, default=None, help="Seconds allowed for the overall p95")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        port = free_port()
+        server = start_server(port, args.workers, args.threads)
+        base_url = f"http://127.0.0.1:{port}"
+    try:
+        results, elapsed = run_load(base_url, args.users, args.duration, args.visits, args.filter_share,
+                                    args.think, args.seed)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    summary = summarize(results, elapsed)
+    print(report(summary))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "settings": vars(args), **summary}, f, indent=4)
+        print(f"Results written to {args.output}")
+    p95 = summary["total"]["p95"]
+    if args.max_p95 is not None and p95 is not None and p95 > args.max_p95:
+        print(f"p95 latency {p95:.3f}s is over the budget of {args.max_p95:.3f}s")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Benchmarks loading, aggregation and rendering on synthetic surveys.
+
+Each size runs in a fresh process so its peak memory is its own. Results
+are written as JSON; pass an earlier results file to --compare to see
+which timings moved.
+
+    python -m benchmarks.run_benchmarks --rows 1000 10000 100000 1000000
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+DATA_DIR = os.path.join("cache", "benchmarks")
+WORDCLOUD_RENDERS = 100  # Renders of the word cloud memory check
+
+
+def peak_memory_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+def timed(timings, name, func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    timings[name] = timings.get(name, 0.0) + time.perf_counter() - started
+    return result
+
+def builder_calls(app, dataset):
+    """Every chart builder of helper_functions with the inputs the dashboard gives it."""
+    from assets import helper_functions
+
+    header = dataset["header"]
+    store = dataset["aggregates"]
+    # Charted the way the question registry dispatches them
+    calls = []
+    for question, spec in dataset["questions"].items():
+        if spec["build"] is not None:
+            builder = getattr(spec["build"], "func", spec["build"])
+            calls.append((builder.__name__, spec["build"], (store["counts"][question], question)))
+
+    snapshots = app.trend_engine.refresh([app.dataset_reloader.file_path])
+    calls.append(("create_yes_histogram", helper_functions.create_yes_histogram, (store["yes_counts"],)))
+    calls.append(("create_cooccurrence_heatmap", helper_functions.create_cooccurrence_heatmap, (store["cooccurrence"],)))
+    calls += [("create_section_summary", app.create_section_summary, (dataset, section))
+              for section in app.section_scales]
+    calls += [("create_trend_chart", helper_functions.create_trend_chart,
+               (app.trend_frame(snapshots, col), header[col], app.categorical_cols[col]))
+              for col in app.likert_cols]
+    return calls
+
+def wordcloud_memory(app, dataset):
+    """Peak memory growth over many uncached word cloud renders, which should stay flat."""
+    import numpy as np
+    from assets.text_analytics import term_frequencies
+    from assets.wordcloud_render import render_wordcloud_png
+
+    rng = np.random.default_rng(0)
+    indexes = [dataset["terms"][dataset["header"][col]] for col in app.wordcloud_cols]
+    # Warm up fonts and buffers before taking the baseline
+    render_wordcloud_png(term_frequencies(indexes[0]) or {"empty": 1}, app.WORDCLOUD_PARAMS)
+    before = peak_memory_mb()
+    for i in range(WORDCLOUD_RENDERS):
+        mask = rng.random(dataset["respondent_count"]) < 0.5
+        frequencies = term_frequencies(indexes[i % len(indexes)], mask)
+        render_wordcloud_png(frequencies or {"empty": 1}, app.WORDCLOUD_PARAMS)
+    return peak_memory_mb() - before
+
+def benchmark_size(rows, seed=0):
+    """Times every stage on a synthetic survey of `rows` respondents, in this process."""
+    import app
+    from assets.likert_scores import score_questions
+    from assets.survey_loader import load_survey, parse_survey_csv
+    from assets.wordcloud_cache import WordCloudCache
+    from benchmarks.synthetic_survey import generate_survey
+
+    timings = {}
+    os.makedirs(DATA_DIR, exist_ok=True)
+    csv_path = os.path.join(DATA_DIR, f"synthetic_{rows}_{seed}.csv")
+    if not os.path.exists(csv_path):
+        timed(timings, "generate", generate_survey, app.file_path, rows, csv_path, app.wordcloud_cols, seed)
+    snapshot = os.path.splitext(csv_path)[0] + ".feather"
+    if os.path.exists(snapshot):
+        os.remove(snapshot)
+
+    timed(timings, "load.csv_parse", parse_survey_csv, csv_path, app.used_cols, app.categorical_cols)
+    timed(timings, "load.csv_and_snapshot_write", load_survey, csv_path, app.used_cols, app.categorical_cols)
+    timed(timings, "load.snapshot_read", load_survey, csv_path, app.used_cols, app.categorical_cols)
+    loader = app.dataset_reloader
+    loader.file_path = csv_path
+    timed(timings, "load.dataset", loader.reload)
+    dataset = loader.current
+
+    for name, builder, args in builder_calls(app, dataset):
+        timed(timings, f"builder.{name}", builder, *args)
+    for scale_groups in app.section_scales.values():
+        for scales in scale_groups:
+            timed(timings, "likert.bootstrap_scores", score_questions, dataset["aggregates"], scales)
+
+    # Memory-only cache, so renders are not served from an earlier run
+    app.wordcloud_cache = WordCloudCache(max_entries=64)
+    for col in app.wordcloud_cols:
+        timed(timings, "wordcloud.cold", app.generate_wordcloud_for_question, dataset, dataset["header"][col])
+    for col in app.wordcloud_cols:
+        timed(timings, "wordcloud.warm", app.generate_wordcloud_for_question, dataset, dataset["header"][col])
+
+    # Word clouds drawn inside the callback, as background jobs would only leave placeholders to time
+    app.wordcloud_cache = WordCloudCache(max_entries=64)
+    app.WORDCLOUD_JOBS = False
+    for tab in app.tabs:
+        timed(timings, f"callback.{tab}", app.update_graphs_by_section, tab, None, None, app.LIVE_DATASET, {})
+
+    return {
+        "rows": rows,
+        "seed": seed,
+        "timings": {name: round(seconds, 6) for name, seconds in timings.items()},
+        "wordcloud_peak_growth_mb": round(wordcloud_memory(app, dataset), 1),
+        "peak_memory_mb": round(peak_memory_mb(), 1),
+    }
+
+def compare(results, baseline_path, threshold=1.2):
+    with open(baseline_path) as f:
+        baseline = {run["rows"]: run for run in json.load(f)["runs"]}
+    for run in results["runs"]:
+        previous = baseline.get(run["rows"])
+        if previous is None:
+            continue
+        for name, seconds in run["timings"].items():
+            before = previous["timings"].get(name)
+            if before and seconds / before >= threshold:
+                print(f"{run['rows']:>9} rows  {name}: {before:.3f}s -> {seconds:.3f}s ({seconds / before:.2f}x)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=SIZES, help="Survey sizes to benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic answers")
+    parser.add_argument("--output", default="benchmark-results.json", help="JSON file of the results")
+    parser.add_argument("--compare", default=None, help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    results = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "runs": [],
+    }
+    for rows in args.rows:
+        # A new process per size, so neither memory nor caches carry over
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            run = pool.submit(benchmark_size, rows, args.seed).result()
+        results["runs"].append(run)
+        slowest = max(run["timings"].items(), key=lambda item: item[1])
+        print(f"{rows:>9} rows  peak {run['peak_memory_mb']:.0f} MB  slowest {slowest[0]} {slowest[1]:.2f}s")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=4)
+    print(f"Results written to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
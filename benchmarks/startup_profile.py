@@ -0,0 +1,74 @@
+"""Profiles the dashboard's cold start and checks it against a time budget.
+
+Imports the app in a fresh interpreter with -X importtime, then reports
+its startup phases, the slowest imports and how long the survey data
+took to be ready. Exits with status 1 when the time until the app could
+serve exceeds --budget, so an autoscaled deployment keeps its cold start.
+
+    python -m benchmarks.startup_profile --deferred --budget 3
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run in the fresh interpreter: the phases up to serving, then the wait for the data
+PROBE = """
+import json, time
+import app
+from assets import startup_profile
+phases = startup_profile.phases()
+started = time.perf_counter()
+app.dataset_reloader.current
+print(json.dumps({"phases": phases, "data_ready_after": time.perf_counter() - started}))
+"""
+
+
+def slowest_imports(importtime_output, limit):
+    """Modules imported by app.py itself, by cumulative import time."""
+    imports = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nesting shows as two spaces per level after the separator's own space
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0 and name.strip() == "app":
+            break  # A module is listed after its imports; later lines are imports made at runtime
+        if depth == 1:
+            imports.append((name.strip(), int(cumulative) / 1e6))
+    return sorted(imports, key=lambda item: item[1], reverse=True)[:limit]
+
+def profile_startup(deferred):
+    env = {**os.environ, "DEFERRED_LOAD": "1" if deferred else "0"}
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", PROBE], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    profile = json.loads(result.stdout.strip().splitlines()[-1])
+    profile["imports"] = slowest_imports(result.stderr, limit=10)
+    return profile
+
+def report(profile):
+    width = max(len(name) for name, _ in profile["phases"] + profile["imports"])
+    lines = ["Startup phases"]
+    lines += [f"  {phase:<{width}}  {seconds:7.3f}s" for phase, seconds in profile["phases"]]
+    lines.append(f"  {'until serving':<{width}}  {sum(seconds for _, seconds in profile['phases']):7.3f}s")
+    lines.append(f"  {'data ready after that':<{width}}  {profile['data_ready_after']:7.3f}s")
+    lines.append("Slowest imports of app.py (cumulative)")
+    lines += [f"  {name:<{width}}  {seconds:7.3f}s" for name, seconds in profile["imports"]]
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--deferred", action="store_true", help="Profile the DEFERRED_LOAD startup mode")
+    parser.add_argument("--budget", type=float, default=None, help="Seconds allowed until the app could serve")
+    args = parser.parse_args()
+
+    profile = profile_startup(args.deferred)
+    print(report(profile))
+    serving = sum(seconds for _, seconds in profile["phases"])
+    if args.budget is not None and serving > args.budget:
+        print(f"Startup took {serving:.2f}s, over the budget of {args.budget:.2f}s")
+        sys.exit(1)
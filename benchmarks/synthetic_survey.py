@@ -0,0 +1,71 @@
+"""Synthetic survey exports with the same columns as a real one.
+
+Every answer is drawn from what respondents actually answered in the
+template export: choice questions keep their answer shares and blank
+rate, free-text questions reuse its vocabulary, word frequencies and
+answer lengths.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from assets.survey_loader import CSV_OPTIONS
+
+# Distinct synthetic answers per free-text column, sampled with repetition
+TEXT_POOL_SIZE = 5000
+
+
+def answer_profiles(template_path, text_cols):
+    """Answer distribution of every column of the template export."""
+    df = pd.read_csv(template_path, dtype=str, **CSV_OPTIONS)
+    profiles = []
+    for col, name in enumerate(df.columns):
+        series = df[name]
+        answered = series.dropna()
+        profile = {"blank": 1 - len(answered) / max(len(series), 1)}
+        if col in text_cols:
+            words = answered.str.split()
+            vocabulary = pd.Series([word for answer in words for word in answer]).value_counts()
+            profile["words"] = vocabulary.index.to_numpy(dtype=object)
+            profile["word_p"] = (vocabulary / vocabulary.sum()).to_numpy()
+            profile["lengths"] = words.str.len().to_numpy()
+        else:
+            shares = answered.value_counts(normalize=True)
+            profile["answers"] = shares.index.to_numpy(dtype=object)
+            profile["answer_p"] = shares.to_numpy()
+        profiles.append(profile)
+    return profiles
+
+def text_pool(profile, rng):
+    # A fixed pool of answers keeps huge surveys cheap to generate
+    if len(profile["words"]) == 0:
+        return np.array([""], dtype=object)
+    lengths = rng.choice(profile["lengths"], TEXT_POOL_SIZE)
+    words = rng.choice(profile["words"], lengths.sum(), p=profile["word_p"])
+    return np.array([" ".join(answer) for answer in np.split(words, np.cumsum(lengths)[:-1])], dtype=object)
+
+def synthetic_column(profile, rows, rng):
+    if "words" in profile:
+        values = rng.choice(text_pool(profile, rng), rows)
+    elif len(profile["answers"]):
+        values = rng.choice(profile["answers"], rows, p=profile["answer_p"])
+    else:
+        values = np.full(rows, None, dtype=object)
+    values[rng.random(rows) < profile["blank"]] = None
+    return values
+
+def generate_survey(template_path, rows, output_path, text_cols=(), seed=0):
+    """Writes a survey of `rows` synthetic respondents, with the template's exact header line."""
+    rng = np.random.default_rng(seed)
+    profiles = answer_profiles(template_path, set(text_cols))
+    columns = {i: synthetic_column(profile, rows, rng) for i, profile in enumerate(profiles)}
+
+    with open(template_path, encoding=CSV_OPTIONS["encoding"]) as f:
+        header_line = f.readline()
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding=CSV_OPTIONS["encoding"], newline="") as f:
+        f.write(header_line)
+        pd.DataFrame(columns).to_csv(f, sep=CSV_OPTIONS["sep"], header=False, index=False)
+    os.replace(tmp_path, output_path)
+    return output_path
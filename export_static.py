@@ -0,0 +1,226 @@
+"""Exports the whole dashboard as a static HTML bundle.
+
+The bundle needs no Dash server: it can be served from any static file
+host. Every chart is rendered independently on a process pool, and the
+export is skipped when neither the CSV nor the earlier exports the trends
+are drawn from changed since the last one.
+
+    python export_static.py --output site
+"""
+import argparse
+import base64
+import hashlib
+import html as html_text
+import json
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import plotly.io as pio
+import plotly.offline
+from dash import dcc, html
+
+import app
+from assets.reloader import file_fingerprint
+
+BUILD_INFO = "build-info.json"
+VOID_TAGS = {"br", "img", "hr"}
+# Props of Dash's own, not HTML attributes; style and src are converted on their own
+SKIPPED_PROPS = {"children", "style", "src", "key", "loading_state", "n_clicks", "n_clicks_timestamp",
+                 "disable_n_clicks"}
+ATTRIBUTE_NAMES = {"className": "class", "htmlFor": "for"}
+
+
+def to_css(style):
+    # Dash styles use camelCase keys, CSS wants kebab-case
+    return "; ".join(f"{re.sub('([A-Z])', lambda m: '-' + m.group(1), key).lower()}: {value}"
+                     for key, value in style.items())
+
+def component_to_html(component, files):
+    """Converts the Dash components used by the charts to plain HTML.
+
+    Inline and served PNGs are moved to files of their own, added to `files`.
+    """
+    if component is None:
+        return ""
+    if isinstance(component, (list, tuple)):
+        return "".join(component_to_html(child, files) for child in component)
+    if not hasattr(component, "to_plotly_json"):
+        return html_text.escape(str(component))
+
+    if isinstance(component, dcc.Graph):
+        return pio.to_html(component.figure, include_plotlyjs=False, full_html=False,
+                           config={"responsive": True})
+
+    tag = type(component).__name__.lower()
+    attributes = ""
+    for prop, value in component.to_plotly_json()["props"].items():
+        # Pattern-matching ids and other structured values have no HTML form
+        if prop in SKIPPED_PROPS or value is None or value is False or not isinstance(value, (str, int, float)):
+            continue
+        name = ATTRIBUTE_NAMES.get(prop, prop.lower())
+        attributes += f" {name}" if value is True else f' {name}="{html_text.escape(str(value))}"'
+    style = getattr(component, "style", None)
+    if style:
+        attributes += f' style="{html_text.escape(to_css(style))}"'
+    src = getattr(component, "src", None)
+    if src:
+        png = None
+        if src.startswith("data:image/png;base64,"):
+            png = base64.b64decode(src.split(",", 1)[1])
+        elif src.startswith(app.wordcloud_cache.url_prefix):
+            png = app.wordcloud_cache.get(src[len(app.wordcloud_cache.url_prefix):-len(".png")])
+        if png is not None:
+            src = f"assets/images/{hashlib.sha256(png).hexdigest()[:32]}.png"
+            files[src] = png
+        attributes += f' src="{html_text.escape(src)}"'
+
+    if tag in VOID_TAGS:
+        return f"<{tag}{attributes}>"
+    return f"<{tag}{attributes}>{component_to_html(getattr(component, 'children', None), files)}</{tag}>"
+
+def render_chart(task):
+    """Renders one chart to HTML, run in a worker process."""
+    kind, col = task
+    dataset = app.dataset_reloader.current
+    header = dataset["header"]
+    files = {}
+
+    if kind == "summary":
+        graph = app.create_section_summary(dataset, col)  # `col` is the section name
+        style = app.DIV5_STYLE
+    elif kind == "trend":
+        snapshots = app.trend_engine.refresh(app.history_files())
+        graph = app.create_trend_chart(app.trend_frame(snapshots, col), header[col], app.categorical_cols[col])
+        style = app.DIV_STYLE
+    elif col in app.wordcloud_cols:
+        graph = app.generate_wordcloud_for_question(dataset, header[col])
+        style = app.DIV5_STYLE
+    else:
+        graph = app.create_graph_for_question(dataset, header[col])
+        style = app.DIV5_STYLE if col in app.sections["Extra Section: Blue cloud Services usage"] else app.DIV_STYLE
+
+    return task, component_to_html(html.Div(children=[graph], style=style), files), files
+
+def page_html(dataset, tab_bodies):
+    buttons = "".join(
+        f'<button class="tab" data-tab="tab-{i}">{html_text.escape(tab)}</button>'
+        for i, tab in enumerate(tab_bodies)
+    )
+    panels = "".join(
+        f'<div class="panel" id="tab-{i}">{body}</div>' for i, body in enumerate(tab_bodies.values())
+    )
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{html_text.escape(app.app.title)}</title>
+<script src="assets/plotly.min.js"></script>
+<style>
+body {{ font-family: Arial, sans-serif; margin: 24px; }}
+.tabs {{ display: flex; flex-wrap: wrap; border-bottom: 1px solid #d6d6d6; }}
+.tab {{ flex: 1; padding: 12px; border: 1px solid #d6d6d6; border-bottom: none; background: #f9f9f9; cursor: pointer; }}
+.tab.selected {{ background: #ffffff; border-top: 2px solid #1975fa; }}
+.panel {{ display: none; }}
+.panel.selected {{ display: block; }}
+</style>
+</head>
+<body>
+<div style="display: flex; align-items: center; margin-bottom: 20px">
+<img src="assets/logo.png" style="width: 35%; height: auto; max-width: 600px; margin-right: 20px">
+<div>
+<h1 style="text-align: left; color: #2c3e50; font-size: 28px">Stakeholder Consultation Survey Dashboard</h1>
+<p style="text-align: left; color: #7f8c8d; font-size: 16px">Explore the survey results through interactive visualizations.</p>
+</div>
+</div>
+<div style="{html_text.escape(to_css(app.COUNTER_STYLE))}">Respondent Count: {dataset['respondent_count']}<br>Latest update: {dataset['modified'].strftime('%d-%m-%Y')}</div>
+<div class="tabs">{buttons}</div>
+{panels}
+<script>
+function showTab(id) {{
+    document.querySelectorAll(".tab").forEach(t => t.classList.toggle("selected", t.dataset.tab === id));
+    document.querySelectorAll(".panel").forEach(p => p.classList.toggle("selected", p.id === id));
+    window.dispatchEvent(new Event("resize"));  // Charts drawn while hidden need their size again
+}}
+document.querySelectorAll(".tab").forEach(t => t.addEventListener("click", () => showTab(t.dataset.tab)));
+showTab("tab-0");
+</script>
+</body>
+</html>
+"""
+
+def source_versions(dataset):
+    # The live data and every earlier export the trends are drawn from
+    return {"version": dataset["version"],
+            "history": {path: file_fingerprint(path)[1] for path in app.history_files()[:-1]}}
+
+def export(output_dir, workers=None, force=False):
+    dataset = app.dataset_reloader.current
+    versions = source_versions(dataset)
+    info_path = os.path.join(output_dir, BUILD_INFO)
+    if not force and os.path.exists(info_path):
+        with open(info_path) as f:
+            info = json.load(f)
+        if {key: info.get(key) for key in versions} == versions:
+            print(f"{output_dir} is already up to date with {app.file_path} and its earlier exports")
+            return False
+
+    started = time.time()
+    tasks = [("section", col) for section_columns in app.sections.values() for col in section_columns]
+    tasks += [("summary", section) for section in app.section_scales]
+    tasks += [("trend", col) for col in app.likert_cols]
+
+    # Charts are independent, so they are rendered across all cores
+    rendered = {}
+    files = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for task, chart_html, chart_files in pool.map(render_chart, tasks):
+            rendered[task] = chart_html
+            files.update(chart_files)
+
+    tab_bodies = {}
+    for section, section_columns in app.sections.items():
+        subtitle = app.section_subtitles.get(section, "Explore this section for detailed insights.")
+        layout = {"width": "100%"} if section == "Extra Section: Blue cloud Services usage" else app.SECTION_LAYOUT
+        tab_bodies[section] = (
+            f'<h2 style="text-align: center; font-size: 20px; color: #34495e">{html_text.escape(subtitle)}</h2>'
+            f'<div style="{html_text.escape(to_css(layout))}">'
+            + rendered.get(("summary", section), "")
+            + "".join(rendered[("section", col)] for col in section_columns)
+            + "</div>"
+        )
+    tab_bodies[app.TRENDS_TAB] = (
+        f'<div style="{html_text.escape(to_css(app.SECTION_LAYOUT))}">'
+        + "".join(rendered[("trend", col)] for col in app.likert_cols)
+        + "</div>"
+    )
+
+    # Write everything to a fresh folder first, so a host never serves half an export
+    tmp_dir = f"{output_dir.rstrip(os.sep)}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(os.path.join(tmp_dir, "assets", "images"))
+    with open(os.path.join(tmp_dir, "assets", "plotly.min.js"), "w", encoding="utf-8") as f:
+        f.write(plotly.offline.get_plotlyjs())
+    shutil.copy("assets/EOSC _ BlueCloud2026_Payoff_ColourPos.png", os.path.join(tmp_dir, "assets", "logo.png"))
+    for path, content in files.items():
+        with open(os.path.join(tmp_dir, path), "wb") as f:
+            f.write(content)
+    with open(os.path.join(tmp_dir, "index.html"), "w", encoding="utf-8") as f:
+        f.write(page_html(dataset, tab_bodies))
+    with open(os.path.join(tmp_dir, BUILD_INFO), "w") as f:
+        json.dump({**versions, "source": app.file_path, "exported": time.strftime("%Y-%m-%dT%H:%M:%S")}, f, indent=4)
+
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.replace(tmp_dir, output_dir)
+    print(f"Exported {len(tasks)} charts to {output_dir} in {time.time() - started:.1f}s")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="site", help="Folder of the static bundle (default: site)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per core)")
+    parser.add_argument("--force", action="store_true", help="Export even when the data did not change")
+    args = parser.parse_args()
+    export(args.output, workers=args.workers, force=args.force)
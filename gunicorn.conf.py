@@ -0,0 +1,50 @@
+"""Gunicorn settings for serving the dashboard with several workers.
+
+    gunicorn app:server
+
+The app is preloaded in the master process, so the CSV is parsed and
+counted, and the warm charts rendered, once per deploy. Workers are
+forked from it and share that memory copy-on-write instead of each
+loading their own copy.
+
+The CSV watcher also runs in the master only. When the export changes or
+new answers arrive, the master rebuilds the dataset once and restarts
+the workers gracefully (as on HUP), so the new workers share the new copy
+and memory stays flat however many workers there are. Batches posted to
+/ingest are therefore picked up on the master's next poll.
+
+With DASHBOARD_METRICS=1, /metrics is answered by whichever worker takes
+the request, with that worker's samples only (see assets/metrics.py).
+"""
+import gc
+import multiprocessing
+import os
+import signal
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8050")
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count()))
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+preload_app = True  # Data rebuilds happen in the master too, see when_ready
+
+# Tells app.py to leave starting the CSV watcher to when_ready
+os.environ["DASHBOARD_PRELOAD"] = "1"
+
+
+def freeze_for_workers():
+    # The preloaded objects are never scanned by the collector again, which
+    # would otherwise write to their pages and unshare them in every worker
+    gc.unfreeze()
+    gc.collect()  # Cycles of the dataset just replaced
+    gc.freeze()
+
+def when_ready(server):
+    import app
+
+    def restart_workers():
+        # Rebuilt here once; the workers forked next share the new dataset
+        freeze_for_workers()
+        os.kill(os.getpid(), signal.SIGHUP)
+
+    freeze_for_workers()
+    app.dataset_reloader.on_change = restart_workers
+    app.dataset_reloader.start()
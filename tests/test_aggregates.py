@@ -0,0 +1,50 @@
+"""Counts of a store built by appending rows, after a load or chunk by chunk, match a store built at once.
+
+Rows appended after the first load are encoded in the order their answers
+are first seen, which must not leak into the counts the charts are drawn
+from, filtered or not.
+"""
+import numpy as np
+
+import app
+from assets.aggregates import filtered_counts
+from assets.survey_loader import load_survey
+
+FIRST_ROWS = 20
+
+
+def masks(store):
+    # Every answer of the filters, plus a subset no filter gives
+    yield "every third row", np.arange(store["row_count"]) % 3 == 0
+    for question, bitmaps in store["bitmaps"].items():
+        for label, bitmap in bitmaps.items():
+            yield f"{question[:40]} = {label}", bitmap
+
+def assert_same_counts(store, expected):
+    assert store["row_count"] == expected["row_count"]
+    for question, counts in expected["counts"].items():
+        assert list(store["counts"][question].items()) == list(counts.items()), question
+    for name, mask in masks(expected):
+        for question in expected["codes"]:
+            assert (list(filtered_counts(store, question, mask).items())
+                    == list(filtered_counts(expected, question, mask).items())), (question, name)
+
+def test_appended_store_counts_like_a_full_load():
+    df, header = load_survey(app.file_path, app.used_cols, app.categorical_cols)
+    expected, _ = app.aggregate_answers(df, header)
+
+    store, terms = app.aggregate_answers(df.iloc[:FIRST_ROWS], header)
+    store, _ = app.append_answers(store, terms, df.iloc[FIRST_ROWS:], header)
+
+    assert_same_counts(store, expected)
+
+def test_chunked_load_counts_like_a_whole_file_read(monkeypatch):
+    df, header = load_survey(app.file_path, app.used_cols, app.categorical_cols)
+    expected, _ = app.aggregate_answers(df, header)
+
+    # Chunks that do not divide the export, so the last one is short
+    monkeypatch.setattr(app, "CSV_CHUNK_ROWS", 37)
+    store, _, chunk_header = app.aggregate_in_chunks(app.file_path)
+
+    assert chunk_header == header
+    assert_same_counts(store, expected)
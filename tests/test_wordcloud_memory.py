@@ -0,0 +1,55 @@
+"""Memory of word cloud rendering stays flat over thousands of renders.
+
+Renders used to go through matplotlib figures, which kept growing the
+process. A few hundred renders show a leak per render; for the long run
+before a release, set WORDCLOUD_MEMORY_RENDERS=2000.
+"""
+import gc
+import os
+import tracemalloc
+
+import numpy as np
+import psutil
+
+from assets.wordcloud_render import render_wordcloud_png
+
+RENDERS = int(os.environ.get("WORDCLOUD_MEMORY_RENDERS", "300"))
+WARMUP_RENDERS = 20  # Fonts, caches and buffers that are allocated once
+# Small images keep the test quick; a leak per render shows at any size
+PARAMS = {"width": 160, "height": 80, "max_words": 40, "max_font_size": 40,
+          "background_color": "white", "random_state": 0}
+MAX_TRACED_GROWTH_MB = 2
+MAX_RSS_GROWTH_MB = 40
+
+
+def random_frequencies(rng, vocabulary):
+    words = rng.choice(vocabulary, size=60, replace=False)
+    return {str(word): int(count) for word, count in zip(words, rng.integers(1, 100, size=len(words)))}
+
+def test_wordcloud_memory_stays_flat():
+    rng = np.random.default_rng(0)
+    vocabulary = np.array([f"term{i}" for i in range(500)])
+    process = psutil.Process()
+
+    for _ in range(WARMUP_RENDERS):
+        render_wordcloud_png(random_frequencies(rng, vocabulary), PARAMS)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        traced_before, _ = tracemalloc.get_traced_memory()
+        rss_before = process.memory_info().rss
+
+        for _ in range(RENDERS):
+            png = render_wordcloud_png(random_frequencies(rng, vocabulary), PARAMS)
+            assert png.startswith(b"\x89PNG")
+
+        gc.collect()
+        traced_after, _ = tracemalloc.get_traced_memory()
+        rss_after = process.memory_info().rss
+    finally:
+        tracemalloc.stop()
+
+    traced_growth_mb = (traced_after - traced_before) / 2**20
+    rss_growth_mb = (rss_after - rss_before) / 2**20
+    assert traced_growth_mb < MAX_TRACED_GROWTH_MB, f"Python allocations grew by {traced_growth_mb:.1f} MB"
+    assert rss_growth_mb < MAX_RSS_GROWTH_MB, f"Resident memory grew by {rss_growth_mb:.1f} MB"